@@ -1,5 +1,7 @@
+import gc
 import time
 import board
+import busio
 import digitalio
 from audio import AudioPlayer
 from high_score import HighScoreManager
@@ -7,18 +9,69 @@ from visual import Visuals
 from rotary_encoder import RotaryEncoder 
 from neo_pixel import NeoPixel
 from accelerometer import Accelerometer
+from bus_scheduler import BusScheduler
+from debug_log import RingLog
+from song_catalog import SongCatalog
+from power import PowerGovernor
+from overload import OverloadController
+import telemetry
+
+# Performance mode: the playing state allocates nothing per frame. Debug
+# output goes to a ring buffer (dumped when a song ends) instead of print(),
+# and the garbage collector only runs at safe points.
+PERFORMANCE_MODE = True
+# Note renderer: "sprites" moves one TileGrid per note, "bitmap" scrolls the
+# notes through a single playfield bitmap (see Visuals)
+RENDERER = "sprites"
+# Chord rule: one flick scores every flick note in the hit window across the
+# lanes. False scores only the first lane's, like a single button.
+CHORDS = True
+
+def level_distribution(total_beats, max_level=10):
+  """Split a chart into levels, returns (beats per level, start index per level)"""
+  level_beat_counts = []
+  level_start_indices = []
+
+  # Progressive distribution: 1, 2, 3, 4, 5, 6, 7, 8, 9, 10 parts
+  # Total parts = 1+2+3+4+5+6+7+8+9+10 = 55 parts
+  total_parts = sum(range(1, max_level + 1))
+
+  cumulative_beats = 0
+  for level in range(1, max_level + 1):
+    parts_for_level = level  # Level 1 gets 1 part, Level 2 gets 2 parts, etc.
+    beats_for_level = max(1, int(total_beats * parts_for_level / total_parts))
+
+    level_start_indices.append(cumulative_beats)
+    level_beat_counts.append(beats_for_level)
+    cumulative_beats += beats_for_level
+
+  # Add any leftover beats to the last level
+  leftover_beats = total_beats - cumulative_beats
+  if leftover_beats > 0:
+    level_beat_counts[-1] += leftover_beats
+
+  return level_beat_counts, level_start_indices
 
 class GameManager:
+  FPS = 30 # frames per second
+
   def __init__(self):
     # set up audio and visuals
     self.audio = AudioPlayer()
-    i2c = board.I2C() 
-    self.visual = Visuals(i2c)
+    # both the OLED and the ADXL345 support fast mode (400 kHz)
+    i2c = busio.I2C(board.SCL, board.SDA, frequency=400000)
+    self.visual = Visuals(i2c, renderer=RENDERER)
     self.accelerometer = Accelerometer(i2c)
+    # the display and accelerometer share the bus, the scheduler interleaves them
+    self.bus = BusScheduler(self.visual.display, self.accelerometer)
     self.high_score_manager = HighScoreManager()
 
     self.high_score_list = self.high_score_manager.get_top_scores()
     self.initials = "AAA"
+    # only the index is scanned here, charts are loaded when a song starts
+    self.catalog = SongCatalog()
+    self.song_index = 0
+    self.beat_map = []
     
     # set up buttons
     pins = [board.D2, board.D3, board.D8, board.D9]
@@ -34,6 +87,8 @@ class GameManager:
         buttons.append(b)
     self.buttons = buttons
     self.buttons_prev_state = [True] * len(buttons)
+    self.clicked = [False] * len(buttons)  # reused by check_clicks every tick
+    self.released = [False] * len(buttons)  # buttons let go this tick, for holds
 
     # set up rotary encoder
     encoder = RotaryEncoder(board.D0, board.D1, debounce_ms=3, pulses_per_detent=3)
@@ -48,6 +103,9 @@ class GameManager:
     self.beat_index = 0
     self.score = 0
     self.misses = 0
+    self.max_misses = 10  # one more miss than this loses the game
+    self.combo = 0
+    self.COMBO_PULSE = 10  # pulse the LEDs every 10 hits in a row
     
     # Level system
     self.current_level = 1
@@ -56,9 +114,10 @@ class GameManager:
     self.level_start_indices = []  # Will store starting beat index for each level
     self.completed_beats = 0  # Track beats that have been hit or missed
 
-    # Game states
-    self.state = "menu"  # can be: "menu", "playing", "gameover", "loading", "high scores"
+    # Game states, see build_states()
+    self.state = None
     self.game_result = None  # "win" or "lose"
+    self.track = 1
     
     # Menu state variables
     self.difficulty = 0  # 0=easy, 1=medium, 2=hard, 3=custom
@@ -66,35 +125,130 @@ class GameManager:
 
     self.song_start = 0
 
-    FPS = 30 # frames per second
+    FPS = self.FPS
     SPEED = 1.5 # pixel per frame
     HIT_Y = 56
-    self.FPS = FPS
     self.FALL_TIME = HIT_Y / (SPEED * FPS)
+    # hold duration in seconds to body length in note position units
+    self.HOLD_SCALE = SPEED * FPS * self.visual.SUBPIXEL
 
     self.last_input_update = 0
     self.visual_update = 0
     self.input_interval = 0.005 # maybe we should use 0.003
     self.visual_interval = 1 / FPS
+    self.chords = CHORDS
+
+    # the clock and recorder are swapped out by InputReplay / InputRecorder
+    self.clock = time.monotonic
+    self.recorder = None
+    self.telemetry = None  # see Telemetry.start
+    self.upload = None  # see ChartUpload.start
+    self.upload_track = None  # DFPlayer track of a chart sent by ChartUpload
+
+    self.log = RingLog(echo=not PERFORMANCE_MODE)
+    # collect garbage when the chart has a gap at least this long (seconds)
+    self.GC_GAP = 0.5
+    self.gc_done = False
+    # sleeps between ticks and lowers the rates outside of gameplay
+    self.governor = PowerGovernor(self)
+    # sheds HUD, LED and display work while songs overrun their frames
+    self.overload = OverloadController(self)
+
+    self.build_states()
+    self.set_state("menu")
     time.sleep(1)
 
+  def build_states(self):
+    # name: (enter, exit, on_input, on_frame)
+    # enter and exit run once per transition (None if there is nothing to do),
+    # on_input(clicked, now) every input tick and on_frame(now) every frame
+    self.states = {
+      "menu": (self.enter_menu, None, self.handle_menu_input, self.update_menu_display),
+      "song select": (self.enter_song_select, None, self.handle_song_select_input, self.idle_frame),
+      "playing": (self.enter_playing, self.exit_playing, self.handle_playing_input, self.update_game_display),
+      "gameover": (self.enter_gameover, None, self.handle_gameover_input, self.idle_frame),
+      "high scores": (self.enter_high_scores, None, self.handle_high_scores_input, self.idle_frame),
+      "save scores": (self.enter_save_scores, None, self.handle_save_scores_input, self.idle_frame),
+    }
+
+  def set_state(self, name):
+    """Leave the current state and enter another one"""
+    if self.state is not None:
+      leave = self.states[self.state][1]
+      if leave is not None:
+        leave()
+    self.state = name
+    idle = name != "playing"
+    if idle != self.governor.idle:
+      now = self.clock()
+      if idle:
+        self.governor.reset_stats(now)
+      else:
+        self.governor.print_report(now)
+      self.governor.set_idle(idle, now)
+    enter, _, self.on_input, self.on_frame = self.states[name]
+    if enter is not None:
+      enter()
+
+  def idle_frame(self, now):
+    # static screens are drawn by their enter hook and redrawn on input
+    pass
+
   def start_game(self, track):
+    """Play the assigned beat map with a DFPlayer track"""
+    self.track = track
+    self.set_state("playing")
+
+  def start_song(self, index):
+    """Load a song of the catalog for the chosen difficulty and play it"""
+    # drop the previous chart before reading the next one
+    self.beat_map = []
+    self.upload_track = None
+    gc.collect()
+    try:
+      beat_map = self.catalog.load_chart(index, self.difficulty)
+      track = self.catalog.song(index).track
+    except OSError as error:
+      print("Cannot load song", index + 1, error)
+      self.show_song("Chart file missing")
+      return
+    except ValueError as error:
+      print("Cannot load song", index + 1, error)
+      self.show_song("Chart has errors")
+      return
+    self.assign_beat_map(beat_map)
+    self.start_game(track)
+
+  def enter_playing(self):
     self.beat_index = 0
     self.score = 0
     self.misses = 0
+    self.combo = 0
     self.current_level = 1
     self.completed_beats = 0
     self.game_result = None
-    self.state = "playing"
     
     # Set difficulty-based note height
     self.visual.set_difficulty(self.difficulty)
     
     self.visual.show_game()
-    self.audio.play(track)
-    self.song_start = time.monotonic()
+    self.visual.clear_notes()
+    self.gc_done = False
+    gc.collect()
+    self.audio.play(self.track)
+    self.song_start = self.clock()
+    self.bus.reset_stats()
+    self.overload.reset(self.song_start)
+    if self.recorder is not None:
+      self.recorder.song_start(self.track, self.song_start)
+    if self.telemetry is not None:
+      self.telemetry.song_start(self.track, self.difficulty, self.song_start)
     
-    print(f"Starting Level {self.current_level} with {self.level_beat_counts[0]} beats")
+    self.log.log("Starting level 1, beats:", self.level_beat_counts[0])
+
+  def exit_playing(self):
+    self.visual.clear_notes()
+    self.overload.reset(self.clock())
 
   def assign_beat_map(self, beat_map):
     self.beat_map = beat_map
@@ -103,146 +257,199 @@ class GameManager:
   def calculate_level_distribution(self):
     """Calculate how many beats each level should have - total 100% distributed progressively"""
     total_beats = len(self.beat_map)
-    self.level_beat_counts = []
-    self.level_start_indices = []
-    
-    # Progressive distribution: 1, 2, 3, 4, 5, 6, 7, 8, 9, 10 parts
-    # Total parts = 1+2+3+4+5+6+7+8+9+10 = 55 parts
-    total_parts = sum(range(1, self.max_level + 1))
-    
-    cumulative_beats = 0
-    for level in range(1, self.max_level + 1):
-      parts_for_level = level  # Level 1 gets 1 part, Level 2 gets 2 parts, etc.
-      beats_for_level = max(1, int(total_beats * parts_for_level / total_parts))
-      
-      self.level_start_indices.append(cumulative_beats)
-      self.level_beat_counts.append(beats_for_level)
-      cumulative_beats += beats_for_level
-      
-      percentage = (parts_for_level / total_parts) * 100
-      print(f"Level {level}: {beats_for_level} beats ({percentage:.1f}%) - Start index: {self.level_start_indices[-1]}")
-    
-    # Add any leftover beats to level 10
-    leftover_beats = total_beats - cumulative_beats
-    if leftover_beats > 0:
-      self.level_beat_counts[-1] += leftover_beats
-      print(f"Added {leftover_beats} leftover beats to Level 10. New count: {self.level_beat_counts[-1]}")
-    
-    print(f"Total beats distributed: {sum(self.level_beat_counts)}/{total_beats}")
+    self.level_beat_counts, self.level_start_indices = level_distribution(total_beats, self.max_level)
+
+    self.log.log("Beats per level:", self.level_beat_counts)
+    self.log.log("Total beats distributed:", total_beats)
   
   def check_clicks(self):
-    clicked = [False] * len(self.buttons)
-    for i, button in enumerate(self.buttons):
-      pressed = not button.value # active low
+    """Buttons pressed since the last tick, the ones let go are set in self.released"""
+    clicked = self.clicked
+    for i in range(len(self.buttons)):
+      clicked[i] = False
+      pressed = not self.buttons[i].value # active low
       was_pressed = not self.buttons_prev_state[i]
       if pressed and was_pressed:
         clicked[i] = True
+      self.released[i] = self.buttons_prev_state[i] and not pressed
       self.buttons_prev_state[i] = pressed
     return clicked
   
   def check_rotary_menu(self):
     changed = self.rotary_encoder.update()
     if changed:
-      print("Position:", self.rotary_encoder.position)
+      if self.recorder is not None:
+        self.recorder.rotary(self.rotary_encoder.position)
+      self.log.log("Position:", self.rotary_encoder.position)
       # In menu: change difficulty selection using position
       self.difficulty = self.rotary_encoder.position % len(self.difficulties)
-      print(f"Difficulty: {self.difficulties[self.difficulty]}")
+      self.log.log("Difficulty:", self.difficulties[self.difficulty])
   
   def check_rotary_playing(self):
     changed = self.rotary_encoder.update()
     if changed:
+      if self.recorder is not None:
+        self.recorder.rotary(self.rotary_encoder.position)
       # In game: change volume using delta
       delta = self.rotary_encoder.get_delta()
-      print("Rotary Delta:", delta)
+      self.log.log("Rotary Delta:", delta)
       if delta > 0:
-        print("increase volume")
+        self.log.log("increase volume")
         for _ in range(abs(delta)):  # Handle multiple steps
           self.audio.increase_volume()
       elif delta < 0:
-        print("decrease volume")
+        self.log.log("decrease volume")
         for _ in range(abs(delta)):  # Handle multiple steps
           self.audio.decrease_volume()
   
   def update(self):
-    if self.state == "":
-      return
-
-    now = time.monotonic()
+    now = self.clock()
+    self.bus.sample_accelerometer(now)
 
     if (now - self.last_input_update) >= self.input_interval:
       clicked = self.check_clicks()
-      
-      if self.state == "menu":
-        self.check_rotary_menu()
-        self.handle_menu_input(clicked)
-      elif self.state == "playing":
-        self.check_rotary_playing()
-        self.handle_playing_input(clicked, now)
-      elif self.state == "gameover":
-        self.handle_gameover_input(clicked)
-      elif self.state == "high scores":
-        self.handle_high_scores_input(clicked)
-      elif self.state == "save scores":
-        self.handle_save_scores_input(clicked) # DOM-TODO: handle save scores input
-      
+      self.input_tick(now, clicked)
+      if self.governor.idle:
+        self.governor.input_seen(clicked, now)
       self.last_input_update = now
       
     if (now - self.visual_update) >= self.visual_interval:
-      if self.state == "menu":
-        self.update_menu_display()
-      elif self.state == "playing":
-        self.update_game_display(now)
-      elif self.state == "gameover":
-        self.update_gameover_display()
-      elif self.state == "high scores":
-        self.update_high_scores_display()  # Same as gameover for now DOM-TODO: update high scores
-      elif self.state == "save scores":
-        self.handle_save_scores_display() # DOM-TODO: update high scores
-      
+      self.frame_tick(now)
+      if self.governor.idle or self.overload.should_render():
+        self.bus.refresh_display(now)
+      cost = self.clock() - now
+      if not self.governor.idle:
+        self.overload.frame_done(now, now - self.visual_update - self.visual_interval, cost)
+      if self.telemetry is not None:
+        self.telemetry.frame(cost)
       self.visual_update = now
 
-  def handle_menu_input(self, clicked):
+    if not self.overload.shed_leds:
+      self.pixels.tick(now)
+    if self.governor.idle:
+      self.governor.nap(self.clock())
+
+  def input_tick(self, now, clicked):
+    if self.recorder is not None:
+      self.recorder.input_tick(now, clicked, self.released)
+    if self.telemetry is not None:
+      self.telemetry.tick(now)
+    self.on_input(clicked, now)
+
+  def frame_tick(self, now):
+    if self.recorder is not None:
+      self.recorder.frame(now)
+    if self.telemetry is not None:
+      self.telemetry.tick(now)
+    self.on_frame(now)
+
+  def enter_menu(self):
+    self.visual.show_menu(self.difficulty)
+
+  def handle_menu_input(self, clicked, now):
+    if self.upload is not None:
+      self.upload.poll(now)
+    self.check_rotary_menu()
     # Any button: Start game
     for i, was_clicked in enumerate(clicked):
       if was_clicked:
         if (self.difficulty == len(self.difficulties) - 1):  # High Scores selected
-          self.state = "high scores"
-        else:
+          self.set_state("high scores")
+        elif self.upload_track is not None and not (i == 3 and len(self.catalog) > 0):
+          # an uploaded chart, the last button opens the song list instead
+          self.start_game(self.upload_track)
+        elif len(self.catalog) > 0:
+          self.set_state("song select")
+        elif len(self.beat_map) > 0:  # a chart assigned from code.py
           self.start_game(track=1)
+        else:
+          print("No songs, add them to songs/index.txt")
         break  # Only need to start once even if multiple buttons pressed
 
+  def enter_song_select(self):
+    self.rotary_encoder.get_delta()  # turns made in the menu don't count
+    self.show_song()
+
+  def show_song(self, message=None):
+    """The song-select screen, message replaces the help line"""
+    try:
+      song = self.catalog.song(self.song_index)
+    except (OSError, ValueError) as error:
+      # the index changed on flash since the scan at boot
+      print("Cannot read song", self.song_index + 1, error)
+      song = None
+      message = "Cannot read song"
+    self.visual.show_song_select(song, self.song_index, len(self.catalog), self.difficulties[self.difficulty], message)
+
+  def handle_song_select_input(self, clicked, now):
+    # rotary: browse songs
+    if self.rotary_encoder.update():
+      if self.recorder is not None:
+        self.recorder.rotary(self.rotary_encoder.position)
+      self.song_index = (self.song_index + self.rotary_encoder.get_delta()) % len(self.catalog)
+      self.show_song()
+    # last button: back to the menu, any other: play
+    if clicked[3]:
+      self.set_state("menu")
+      return
+    for i in range(3):
+      if clicked[i]:
+        self.start_song(self.song_index)
+        break
+
   def handle_playing_input(self, clicked, now):
-    song_now = now - self.song_start
-    
-    # Handle button presses (tap notes)
-    for i, was_clicked in enumerate(clicked):
-      if was_clicked:
-        if self.visual.note_hit(i, is_flick=False):  # Tap input
-          self.score += 1
-          self.completed_beats += 1  # Track completed beat
-          self.pixels.set_color(0,255,0)
-    
-    # Handle flick motion (flick notes)
+    self.check_rotary_playing()
+
     isFlicked = self.accelerometer.detect_flick()
     if isFlicked:
-      print("Flick detected!")
-      # Check all lanes for flick notes
-      hit_any_flick = False
-      for lane in range(4):
-        if self.visual.note_hit(lane, is_flick=True):  # Flick input
+      if self.recorder is not None:
+        self.recorder.flick()
+      self.log.log("Flick detected!")
+
+    # Judge the button presses (tap notes, hold heads) and the flick (flick
+    # notes) together, in one pass over the lanes
+    visual = self.visual
+    if isFlicked or True in clicked:
+      visual.judge(clicked, isFlicked, self.chords)
+    flick_lane = telemetry.NO_LANE
+    for i in range(len(clicked)):
+      if clicked[i]:
+        hit = visual.tap_results[i]
+        if hit == visual.HIT:
           self.score += 1
-          self.completed_beats += 1
-          self.pixels.set_color(0,255,0)
-          hit_any_flick = True
-          break
+          self.completed_beats += 1  # Track completed beat
+          self.register_hit(now)
+        elif hit == visual.HOLD:
+          self.register_hit(now)  # scored when it is let go
+      if isFlicked and visual.flick_results[i]:
+        self.score += 1
+        self.completed_beats += 1
+        self.register_hit(now)
+        if flick_lane == telemetry.NO_LANE:
+          flick_lane = i
+      # releases (hold tails)
+      if self.released[i] and visual.holding[i] is not None:
+        self.completed_beats += 1
+        if visual.release_hold(i):
+          self.score += 1
+          self.pixels.flash_hit(now)
+        else:
+          # let go too early
+          self.misses += 1
+          self.combo = 0
+          self.pixels.flash_miss(now)
+    if isFlicked and self.telemetry is not None:
+      self.telemetry.flick(flick_lane, self.accelerometer.flick_peak)
 
-  def update_menu_display(self):
-    # Clear any notes from previous game
-    self.visual.notes.clear()
-    for child in self.visual.note_group:
-      self.visual.note_group.remove(child)
-    
-    # Display difficulty selection on screen
+  def register_hit(self, now):
+    self.combo += 1
+    if self.combo % self.COMBO_PULSE == 0:
+      self.pixels.pulse_combo(now)
+    else:
+      self.pixels.flash_hit(now)
+
+  def update_menu_display(self, now):
+    # Display difficulty selection on screen, only redrawn when it changes
     self.visual.show_menu(self.difficulty)
 
   def update_game_display(self, now):
@@ -252,45 +459,75 @@ class GameManager:
     while self.beat_index < len(self.beat_map):
       beat_data = self.beat_map[self.beat_index]
       
-      # Handle both old format (time, lane) and new format (time, lane, type)
-      if len(beat_data) == 2:
-        beat_time, lane = beat_data
-        note_type = "tap"  # Default to tap for old beatmaps
-      else:
-        beat_time, lane, note_type = beat_data
+      # Handle the old format (time, lane), (time, lane, type) and holds
+      # (time, lane, "hold", duration)
+      beat_time = beat_data[0]
+      lane = beat_data[1]
+      note_type = "tap"  # Default to tap for old beatmaps
+      length = 0
+      if len(beat_data) > 2:
+        note_type = beat_data[2]
+        if len(beat_data) > 3:
+          length = int(beat_data[3] * self.HOLD_SCALE)
       
       spawn_time = beat_time - self.FALL_TIME
 
       if song_now >= spawn_time:
-        self.visual.spawn_note_in_lane(lane, note_type)
+        if not self.visual.spawn_note_in_lane(lane, note_type, length, self.beat_index):
+          # the lane is full (overlapping notes in the chart), count it as missed
+          if self.telemetry is not None:
+            self.telemetry.judge(telemetry.MISS, lane - 1, 0, self.beat_index)
+          self.misses += 1
+          self.completed_beats += 1
+          self.log.log("Lane full, dropped beat", self.beat_index)
         self.beat_index += 1
+        self.gc_done = False
       else:
         break
 
+    # safe point: nothing on screen and the next note is a while away
+    if not self.gc_done and self.visual.active_notes == 0:
+      if self.beat_index >= len(self.beat_map) or self.beat_map[self.beat_index][0] - self.FALL_TIME - song_now > self.GC_GAP:
+        start = self.clock()
+        gc.collect()
+        self.gc_done = True
+        if self.telemetry is not None:
+          self.telemetry.collected(self.clock() - start)
+
     missed_now = self.visual.update_notes()
+    held = self.visual.holds_done
+    if held:
+      # held to the end
+      self.visual.holds_done = 0
+      self.score += held
+      self.completed_beats += held
+      self.pixels.flash_hit(now)
     if (missed_now > 0):
-      self.pixels.set_color(255,0,0)
+      self.combo = 0
+      self.pixels.flash_miss(now)
     self.misses += missed_now
     self.completed_beats += missed_now  # Track missed beats as completed too
     
-    # Check for lose condition (more than 10 misses)
-    if self.misses > 10:
+    # Check for lose condition (more than max_misses misses)
+    if self.misses > self.max_misses:
       self.game_result = "lose"
+      print(f"Game Over - You Lose! Misses: {self.misses}")
+      self.finish_song()
       if (self.high_score_manager.is_high_score(self.score, self.misses)):
-        self.state = "save scores"
+        self.set_state("save scores")
       else : 
-        self.state = "gameover"
-      print(f"Game Over - You Lose! Misses: {self.misses}")
+        self.set_state("gameover")
       return
     
     # Check for win condition (all beats completed)
     if self.completed_beats >= len(self.beat_map):
-      if (self.high_score_manager.is_high_score(self.score, self.misses)):
-        self.state = "save scores"
-      else : 
-        self.state = "gameover"
       print(f"Game Over - You Lose! Misses: {self.misses}")
       print(f"Game Over - You Win! Score: {self.score}, Misses: {self.misses}")
+      self.finish_song()
+      if (self.high_score_manager.is_high_score(self.score, self.misses)):
+        self.set_state("save scores")
+      else : 
+        self.set_state("gameover")
       return
     
     # Check for level progression based on completed beats
@@ -300,52 +537,53 @@ class GameManager:
       # If we've completed current level's beats, advance to next level
       if self.completed_beats >= level_end_beats and self.current_level < self.max_level:
         self.current_level += 1
-        print(f"Level Up! Now on Level {self.current_level} with {self.level_beat_counts[self.current_level - 1]} beats")
-        print(f"Completed beats: {self.completed_beats}")
+        self.pixels.sweep_level_up(now)
+        self.log.log("Level Up! Now on level", self.current_level)
+        self.log.log("Completed beats:", self.completed_beats)
     
-    self.visual.update_ui(self.score, self.misses, self.current_level)
+    if not self.overload.shed_hud:
+      self.visual.update_ui(self.score, self.misses, self.current_level)
+
+  def finish_song(self):
+    self.log.dump()
+    self.bus.print_report()
+    self.overload.print_report()
+    if self.recorder is not None:
+      self.recorder.flush()
+    if self.telemetry is not None:
+      self.telemetry.flush()
 
-  def handle_gameover_input(self, clicked):
+  def handle_gameover_input(self, clicked, now):
     # Any button: Return to menu
     for i, was_clicked in enumerate(clicked):
       if was_clicked:
-        self.state = "menu"
+        self.set_state("menu")
         print("Returning to menu...")
         break
   
-  def update_gameover_display(self):
-    # Clear any remaining notes
-    self.visual.notes.clear()
-    for child in self.visual.note_group:
-      self.visual.note_group.remove(child)
-    
+  def enter_gameover(self):
     # Show game over screen with results
     self.visual.show_gameover(self.game_result, self.score, self.misses)
 
-  def update_high_scores_display(self):
-    # Clear any remaining notes
-    self.visual.notes.clear()
-    for child in self.visual.note_group:
-      self.visual.note_group.remove(child)
-    
+  def enter_high_scores(self):
     high_scores_list = self.high_score_list
     # Show game over screen with results
     self.visual.show_high_scores(high_scores_list)
 
-  def handle_high_scores_input(self, clicked):
+  def handle_high_scores_input(self, clicked, now):
     # Any button: Return to menu
     for i, was_clicked in enumerate(clicked):
       if was_clicked:
-        self.state = "menu"
+        self.set_state("menu")
         print("Returning to menu...")
         break
 
-  def handle_save_scores_input(self, clicked):
+  def handle_save_scores_input(self, clicked, now):
     # Any button: Return to menu
     if clicked[3]:
       self.high_score_manager.add_score(self.initials, self.score, self.misses)
       self.high_score_list = self.high_score_manager.get_top_scores()
-      self.state = "menu"
+      self.set_state("menu")
       return 
     else:
       for i, was_clicked in enumerate(clicked):
@@ -357,12 +595,9 @@ class GameManager:
           else:
             new_initial = chr(ord(initial) + 1)
           self.initials = self.initials[:i] + new_initial + self.initials[i+1:]
+          self.enter_save_scores()
           break
   
-  def handle_save_scores_display(self):
-    # Clear any remaining notes
-    self.visual.notes.clear()
-    for child in self.visual.note_group:
-      self.visual.note_group.remove(child)
+  def enter_save_scores(self):
     # Show game over screen with results
     self.visual.show_save_score(self.score, self.misses, self.initials)
\ No newline at end of file
@@ -3,11 +3,31 @@ import board
 import adafruit_adxl34x
 import time
 import displayio
+from adafruit_bus_device.i2c_device import I2CDevice
+
+# ADXL345 registers used for the FIFO (see datasheet p.24-25)
+_REG_BW_RATE = 0x2C
+_REG_DATAX0 = 0x32
+_REG_FIFO_CTL = 0x38
+_REG_FIFO_STATUS = 0x39
+_RATE_200_HZ = 0x0B
+_FIFO_STREAM = 0x80  # stream mode: keep the newest 32 samples
+_MS2_PER_LSB = 0.004 * 9.80665  # full resolution is 4 mg per LSB
 
 class Accelerometer:
+  SAMPLE_RATE = 200  # Hz, the FIFO holds 32 samples = 160 ms of motion
+
   def __init__(self, i2c):
     self.accelerometer = adafruit_adxl34x.ADXL345(i2c)
     self.accelerometer.range = adafruit_adxl34x.Range.RANGE_4_G
+
+    # let the sensor buffer samples in its FIFO while the display holds the bus
+    self.device = I2CDevice(i2c, 0x53)
+    self.buffer = bytearray(6)
+    self._write_register(_REG_BW_RATE, _RATE_200_HZ)
+    self._write_register(_REG_FIFO_CTL, _FIFO_STREAM)
+    self.auto_drain = True  # set to False when a BusScheduler drains the FIFO
+    self.flicked = False
     
     # Zero-offset calibration (you already have this!)
     samples = [self.accelerometer.acceleration[2] for _ in range(20)]
@@ -25,6 +45,10 @@ class Accelerometer:
     self.flick_threshold = 1.5    # Much higher threshold - requires strong intentional flicks
     self.cooldown = 0.4 # seconds before detecting again
     self.last_flick = 0
+    # highest high-pass value since the last detect_flick(), and the one
+    # seen with the last flick (telemetry)
+    self.peak_highpass = 0.0
+    self.flick_peak = 0.0
   
   def apply_lowpass_filter(self, raw_value):
     """Apply low-pass filter to reduce high-frequency noise"""
@@ -37,22 +61,55 @@ class Accelerometer:
     self.prev_raw_z = raw_signal
     return self.highpass_z
   
-  def detect_flick(self):
-    x, y, z = self.accelerometer.acceleration
-    now = time.monotonic()
+  def _write_register(self, register, value):
+    self.buffer[0] = register
+    self.buffer[1] = value
+    with self.device as device:
+      device.write(self.buffer, end=2)
+
+  def _read_registers(self, register, length):
+    self.buffer[0] = register
+    with self.device as device:
+      device.write_then_readinto(self.buffer, self.buffer, out_end=1, in_end=length)
 
+  def process_sample(self, z, now):
+    """Run one z sample through the filters and latch a flick if it crosses the threshold"""
     # Apply low-pass filter first to reduce noise
     lowpass_z = self.apply_lowpass_filter(z)
-    
+
     # Apply IIR high-pass filter to isolate quick movements
     highpass_z = self.apply_highpass_filter(lowpass_z)
-    
+    if highpass_z > self.peak_highpass:
+      self.peak_highpass = highpass_z
+
     # Check for flick using high-pass filtered value (detects quick upward motion)
     if highpass_z > self.flick_threshold and now - self.last_flick > self.cooldown:
       self.last_flick = now
-      return True
+      self.flicked = True
 
-    return False
+  def read_fifo(self):
+    """Read every sample queued in the FIFO, returns how many were read"""
+    self._read_registers(_REG_FIFO_STATUS, 1)
+    count = self.buffer[0] & 0x3F
+    now = time.monotonic()
+    for i in range(count):
+      self._read_registers(_REG_DATAX0, 6)
+      raw_z = self.buffer[4] | (self.buffer[5] << 8)
+      if raw_z & 0x8000:
+        raw_z -= 0x10000
+      # samples come out oldest first, spaced by the output data rate
+      self.process_sample(raw_z * _MS2_PER_LSB, now - (count - 1 - i) / self.SAMPLE_RATE)
+    return count
+
+  def detect_flick(self):
+    if self.auto_drain:
+      self.read_fifo()
+    flicked = self.flicked
+    self.flicked = False
+    if flicked:
+      self.flick_peak = self.peak_highpass
+    self.peak_highpass = 0.0
+    return flicked
   
   def tune_parameters(self, lowpass_alpha=None, highpass_alpha=None, threshold=None):
     """Helper function to quickly tune filter parameters"""
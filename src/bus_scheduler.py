@@ -0,0 +1,115 @@
+import time
+
+try:
+  from supervisor import ticks_ms
+except ImportError:
+  # CPython (simulator)
+  def ticks_ms():
+    return time.monotonic_ns() // 1000000
+
+_TICKS_PERIOD = 1 << 29  # supervisor.ticks_ms() wraps around
+_TICKS_MASK = _TICKS_PERIOD - 1
+
+
+def _ticks_diff(end, start):
+  return (end - start) & _TICKS_MASK
+
+
+class BusScheduler:
+  """Arbitrates the shared I2C bus between the OLED and the accelerometer.
+
+  The display no longer refreshes in the background (auto_refresh is turned
+  off); instead every refresh goes through refresh_display(), which drains the
+  accelerometer FIFO right before and right after the transfer. On top of that
+  sample_accelerometer() is called from the main loop and drains the FIFO at
+  least every sample_interval seconds. Because the ADXL345 keeps sampling into
+  its own FIFO while the bus is busy, no samples are lost during a refresh.
+  """
+
+  DEVICES = ("display", "accelerometer")
+  DISPLAY = 0
+  ACCELEROMETER = 1
+
+  def __init__(self, display, accelerometer, sample_interval=0.004):
+    self.display = display
+    self.accelerometer = accelerometer
+    self.sample_interval = sample_interval
+
+    # we decide when the display talks on the bus, not displayio
+    display.auto_refresh = False
+    # the accelerometer is drained by us, detect_flick only reads the latch
+    accelerometer.auto_drain = False
+
+    self.last_sample = 0
+    # Statistics are timed with supervisor.ticks_ms(), a small int, and kept
+    # in preallocated lists so measuring never allocates and stays on while
+    # playing. Transfers shorter than a millisecond count as 0 or 1 ms, which
+    # evens out over a song.
+    self.busy_ms = [0] * len(self.DEVICES)  # time each device held the bus
+    self.transfers = [0] * len(self.DEVICES)
+    self.reset_stats()
+
+  def reset_stats(self):
+    for i in range(len(self.DEVICES)):
+      self.busy_ms[i] = 0
+      self.transfers[i] = 0
+    self.samples = 0
+    self.max_sample_gap_ms = 0
+    self.longest_refresh_ms = 0
+    self.stats_start_ms = ticks_ms()
+    self._last_drain_ms = self.stats_start_ms
+
+  def _drain(self):
+    start = ticks_ms()
+    self.samples += self.accelerometer.read_fifo()
+    end = ticks_ms()
+
+    self.busy_ms[self.ACCELEROMETER] += _ticks_diff(end, start)
+    self.transfers[self.ACCELEROMETER] += 1
+    gap = _ticks_diff(start, self._last_drain_ms)
+    if gap > self.max_sample_gap_ms:
+      self.max_sample_gap_ms = gap
+    self._last_drain_ms = end
+
+  def sample_accelerometer(self, now):
+    """Drain the accelerometer FIFO if the sample interval has elapsed"""
+    if (now - self.last_sample) >= self.sample_interval:
+      self._drain()
+      self.last_sample = now
+
+  def refresh_display(self, now):
+    """Push one frame to the OLED, sandwiched between two accelerometer reads"""
+    self._drain()
+
+    start = ticks_ms()
+    self.display.refresh()
+    took = _ticks_diff(ticks_ms(), start)
+    self.busy_ms[self.DISPLAY] += took
+    self.transfers[self.DISPLAY] += 1
+    if took > self.longest_refresh_ms:
+      self.longest_refresh_ms = took
+
+    self._drain()
+    self.last_sample = now
+
+  def report(self):
+    """Return per-device bus occupancy since the last reset_stats()"""
+    elapsed = max(1, _ticks_diff(ticks_ms(), self.stats_start_ms))
+    result = {}
+    for i, device in enumerate(self.DEVICES):
+      result[device] = {
+        "busy_ms": self.busy_ms[i],
+        "occupancy": self.busy_ms[i] / elapsed,
+        "transfers": self.transfers[i],
+      }
+    result["samples"] = self.samples
+    result["max_sample_gap_ms"] = self.max_sample_gap_ms
+    result["longest_refresh_ms"] = self.longest_refresh_ms
+    return result
+
+  def print_report(self):
+    report = self.report()
+    for device in self.DEVICES:
+      stats = report[device]
+      print(f"Bus {device}: {stats['occupancy'] * 100:.1f}% busy, {stats['transfers']} transfers, {stats['busy_ms']} ms")
+    print(f"Accel samples: {report['samples']}, max gap {report['max_sample_gap_ms']} ms, longest refresh {report['longest_refresh_ms']} ms")
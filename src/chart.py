@@ -0,0 +1,77 @@
+# Chart files: plain text, one note per line, oldest first
+#
+#   # comment
+#   12.254,1,tap
+#   13.617,3,flick
+#   14.002,2,hold,0.750
+#
+# time is in seconds from the start of the track, lane is 1-4 (LANES) and type is
+# "tap", "flick" or "hold". A hold has a fourth field, how long it is held
+# in seconds. Lines are parsed one at a time so a chart never has to be
+# in memory as text.
+
+NOTE_TYPES = ("tap", "flick", "hold")
+LANES = 4  # Visuals.LANES comes from here
+
+
+def parse_line(line):
+  """Return (time, lane, type) for a note line, (time, lane, "hold", duration)
+  for a hold, None for blank/comment lines"""
+  line = line.strip()
+  if not line or line[0] == "#":
+    return None
+  fields = line.split(",")
+  if len(fields) not in (3, 4):
+    raise ValueError("bad chart line: " + line)
+  lane = int(fields[1])
+  if not 1 <= lane <= LANES:
+    # Visuals.spawn_note_in_lane would index past its lanes
+    raise ValueError("lane out of range: " + line)
+  note_type = fields[2].strip()
+  if note_type not in NOTE_TYPES:
+    raise ValueError("unknown note type: " + note_type)
+  if note_type == "hold":
+    duration = float(fields[3]) if len(fields) == 4 else 0
+    if duration <= 0:
+      raise ValueError("hold without a duration: " + line)
+    return (float(fields[0]), lane, note_type, duration)
+  if len(fields) == 4:
+    raise ValueError("only a hold has a duration: " + line)
+  return (float(fields[0]), lane, note_type)
+
+
+def load_chart(filename):
+  """Read a chart file into the list of tuples GameManager.assign_beat_map takes"""
+  notes = []
+  with open(filename, "r") as f:
+    for line in f:
+      note = parse_line(line)
+      if note is not None:
+        notes.append(note)
+  return notes
+
+
+def check_chart(filename):
+  """Parse every line of a chart without keeping the notes, returns how many
+  there are. Raises ValueError on a bad line."""
+  count = 0
+  with open(filename, "r") as f:
+    for line in f:
+      if parse_line(line) is not None:
+        count += 1
+  return count
+
+
+def format_note(note):
+  if len(note) > 3:
+    return "{:.3f},{},{},{:.3f}\n".format(note[0], note[1], note[2], note[3])
+  return "{:.3f},{},{}\n".format(note[0], note[1], note[2])
+
+
+def save_chart(filename, notes, comment=None):
+  with open(filename, "w") as f:
+    if comment:
+      for line in comment.split("\n"):
+        f.write("# " + line + "\n")
+    for note in notes:
+      f.write(format_note(note))
@@ -0,0 +1,278 @@
+import binascii
+import gc
+import os
+import sys
+
+import chart
+
+try:
+  import zlib
+except ImportError:
+  zlib = None
+
+try:
+  import usb_cdc
+except ImportError:
+  usb_cdc = None
+
+try:
+  import supervisor
+except ImportError:
+  supervisor = None
+
+# Chart upload over USB serial, handled while the menu is showing.
+# tools/upload_chart.py is the host side.
+#
+# The protocol is plain ASCII lines, so it also works over the console (the
+# REPL serial of boards without native USB like the ESP32-C3), where a raw
+# 0x03 byte would interrupt the program. Every line starts with TAG, the
+# host ignores anything else the game prints.
+#
+#   host   RGUP BEGIN <name> <track> <size> <crc32> <encoding>
+#                                                     a chart file of size bytes, zlib or raw
+#   board  RGUP READY <encoding> <chunk>              the host's encoding, max bytes per chunk
+#   host   RGUP DATA <seq> <crc32> <base64>           chunk seq, compressed on its own (zlib)
+#   board  RGUP ACK <seq>
+#   board  RGUP NAK <seq> <reason>                    send again from chunk seq
+#   host   RGUP END
+#   board  RGUP DONE <notes>                          saved and loaded
+#   board  RGUP ERR <reason>                          the transfer is dropped
+#   host   RGUP ABORT
+#
+# A board without zlib answers a zlib BEGIN with ERR no zlib, the host then
+# begins again with raw. crc32 values are hex: the one in BEGIN covers the whole file, the one in
+# DATA the chunk as sent. The host may send WINDOW chunks before waiting for
+# their ACKs; chunks after a rejected one are ignored until it comes again,
+# and a chunk that was already written is acknowledged again.
+# Each chunk is written to a temporary file as it arrives, so only one chunk
+# is ever in RAM. When the file is complete and every line parses it
+# replaces UPLOAD_FOLDER + name (a chart of the catalog with that name is
+# replaced too) and is loaded with GameManager.assign_beat_map.
+TAG = b"RGUP"
+CHUNK = 1024  # bytes of chart per chunk, before compression
+WINDOW = 4
+MAX_LINE = 2048  # a chunk that didn't compress, base64 encoded, plus the fields
+UPLOAD_FOLDER = "songs/"
+TEMP_NAME = "upload.tmp"
+ENCODINGS = ("zlib", "raw")
+NAME_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-."
+
+
+class DataLink:
+  """The second USB CDC channel, needs usb_cdc.enable(console=True,
+  data=True) in boot.py"""
+
+  def __init__(self, serial):
+    self.serial = serial
+    self.serial.timeout = 0
+
+  def read(self):
+    waiting = self.serial.in_waiting
+    return self.serial.read(waiting) if waiting else b""
+
+  def write(self, data):
+    self.serial.write(data)
+
+
+class ConsoleLink:
+  """The console, shared with print() and the REPL"""
+
+  def read(self):
+    # a bool on older CircuitPython versions
+    waiting = int(supervisor.runtime.serial_bytes_available)
+    return sys.stdin.read(waiting).encode() if waiting else b""
+
+  def write(self, data):
+    sys.stdout.write(data.decode())
+
+
+def open_link():
+  """usb_cdc.data if boot.py enabled it, else the console"""
+  if usb_cdc is not None and usb_cdc.data is not None:
+    return DataLink(usb_cdc.data)
+  if supervisor is not None:
+    return ConsoleLink()
+  return None
+
+
+class ChartUpload:
+  """Receives charts from tools/upload_chart.py while the menu is showing.
+
+  Writing to flash from code needs CIRCUITPY mounted writable for the board
+  (storage.remount("/", readonly=False) in boot.py).
+  """
+
+  def __init__(self, link=None, folder=UPLOAD_FOLDER):
+    self.link = open_link() if link is None else link
+    self.folder = folder
+    self.line = bytearray()
+    self.file = None
+    self.game = None
+
+  def start(self, game):
+    if self.link is None:
+      print("No serial link for chart uploads")
+      return
+    self.game = game
+    game.upload = self
+
+  def stop(self, game):
+    game.upload = None
+    self.drop()
+
+  def reply(self, *fields):
+    self.link.write(TAG + b" " + " ".join(str(field) for field in fields).encode() + b"\n")
+
+  # called by GameManager on every menu input tick
+  def poll(self, now):
+    """Handle every complete line that has arrived"""
+    data = self.link.read()
+    if not data:
+      return
+    self.game.governor.wake(now)
+    self.line.extend(data)
+    while True:
+      end = self.line.find(b"\n")
+      if end < 0:
+        break
+      line = bytes(self.line[:end]).strip()
+      self.line = self.line[end + 1:]
+      if line.startswith(TAG + b" "):
+        self.handle(line.split(b" ")[1:], now)
+    if len(self.line) > MAX_LINE:
+      self.line = bytearray()
+      self.fail("line too long")
+
+  def handle(self, fields, now):
+    command = fields[0]
+    try:
+      if command == b"BEGIN" and len(fields) == 6:
+        self.begin(fields[1].decode(), int(fields[2]), int(fields[3]), int(fields[4], 16), fields[5].decode(), now)
+      elif command == b"DATA" and len(fields) == 4:
+        self.chunk(int(fields[1]), int(fields[2], 16), fields[3])
+      elif command == b"END":
+        self.end(now)
+      elif command == b"ABORT":
+        self.drop()
+      else:
+        self.fail("bad command")
+    except ValueError:
+      self.fail("bad field")
+
+  def begin(self, name, track, size, crc, encoding, now):
+    self.drop()
+    if not name.endswith(".chart") or any(c not in NAME_CHARS for c in name):
+      self.fail("bad name")
+      return
+    if encoding not in ENCODINGS:
+      self.fail("bad encoding")
+      return
+    if encoding == "zlib" and zlib is None:
+      self.fail("no zlib")
+      return
+    try:
+      self.file = open(self.folder + TEMP_NAME, "wb")
+    except OSError:
+      # read-only unless boot.py remounted CIRCUITPY
+      self.fail("read-only filesystem")
+      return
+    self.name = name
+    self.track = track
+    self.size = size
+    self.crc = crc
+    self.encoding = encoding
+    self.received = 0
+    self.received_crc = 0
+    self.seq = 0
+    self.started = now
+    self.reply("READY", encoding, CHUNK)
+
+  def chunk(self, seq, crc, payload):
+    if self.file is None:
+      self.fail("no upload")
+      return
+    if seq < self.seq:
+      # written already, its ACK got lost
+      self.reply("ACK", seq)
+      return
+    if seq > self.seq:
+      # sent after a chunk that was rejected, it comes again after that one
+      return
+    try:
+      data = binascii.a2b_base64(payload)
+    except ValueError:
+      self.reply("NAK", seq, "bad base64")
+      return
+    if binascii.crc32(data) & 0xFFFFFFFF != crc:
+      self.reply("NAK", seq, "bad checksum")
+      return
+    if self.encoding == "zlib":
+      try:
+        data = zlib.decompress(data)
+      except Exception:  # the error type differs between ports
+        self.reply("NAK", seq, "bad zlib data")
+        return
+    if self.received + len(data) > self.size:
+      self.fail("more data than announced")
+      return
+    try:
+      self.file.write(data)
+    except OSError:
+      self.fail("flash full")
+      return
+    self.received += len(data)
+    self.received_crc = binascii.crc32(data, self.received_crc)
+    self.seq += 1
+    self.reply("ACK", seq)
+
+  def end(self, now):
+    if self.file is None:
+      self.fail("no upload")
+      return
+    self.file.close()
+    self.file = None
+    temp = self.folder + TEMP_NAME
+    if self.received != self.size or self.received_crc & 0xFFFFFFFF != self.crc:
+      self.fail("file checksum")
+      return
+    try:
+      # every line parses and every lane is on the playfield
+      notes = chart.check_chart(temp)
+    except ValueError as error:
+      # the chart that was there stays
+      self.fail(error)
+      return
+    target = self.folder + self.name
+    try:
+      os.remove(target)
+    except OSError:
+      pass
+    try:
+      os.rename(temp, target)
+    except OSError:
+      # flash full or read-only, fail() removes the temporary file
+      self.fail("can't save " + self.name)
+      return
+
+    game = self.game
+    # drop the previous chart before reading the new one
+    game.beat_map = []
+    gc.collect()
+    game.assign_beat_map(chart.load_chart(target))
+    game.upload_track = self.track
+    print(f"Chart upload: {target}, {notes} notes, {self.size} bytes in {now - self.started:.2f} s")
+    self.reply("DONE", notes)
+
+  def fail(self, reason):
+    self.drop()
+    self.reply("ERR", reason)
+
+  def drop(self):
+    """Forget the transfer in progress and its temporary file"""
+    if self.file is not None:
+      self.file.close()
+      self.file = None
+    try:
+      os.remove(self.folder + TEMP_NAME)
+    except OSError:
+      pass
@@ -0,0 +1,41 @@
+class RingLog:
+  """Debug messages kept in a fixed ring buffer instead of printed.
+
+  log() only stores references to the message (a constant string) and one
+  value, so it never allocates. dump() prints and empties the buffer; call it
+  where a pause doesn't matter. With echo=True messages are printed right
+  away, like the plain print() calls they replace.
+  """
+
+  def __init__(self, size=32, echo=False):
+    self.messages = [None] * size
+    self.values = [None] * size
+    self.size = size
+    self.index = 0
+    self.count = 0
+    self.echo = echo
+
+  def log(self, message, value=None):
+    if self.echo:
+      if value is None:
+        print(message)
+      else:
+        print(message, value)
+      return
+    self.messages[self.index] = message
+    self.values[self.index] = value
+    self.index = (self.index + 1) % self.size
+    if self.count < self.size:
+      self.count += 1
+
+  def dump(self):
+    start = (self.index - self.count) % self.size
+    for i in range(self.count):
+      slot = (start + i) % self.size
+      if self.values[slot] is None:
+        print(self.messages[slot])
+      else:
+        print(self.messages[slot], self.values[slot])
+      self.messages[slot] = None
+      self.values[slot] = None
+    self.count = 0
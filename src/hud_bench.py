@@ -0,0 +1,78 @@
+import gc
+import time
+import terminalio
+from adafruit_display_text import label
+from visual import Counter
+
+# HUD benchmark: the "Score: N" label the HUD used to have against the glyph
+# Counter that replaced it. Runs on the device (set HUD_BENCH in code.py).
+# For each widget it reports the RAM it holds once built, the time per
+# update (counting up like a score, garbage collection included) and the
+# bytes allocated per update.
+
+ALLOC_UPDATES = 20  # updates measured with the collector off, labels fill the heap fast
+
+
+def _heap_used():
+  if hasattr(gc, "mem_alloc"):
+    return gc.mem_alloc()
+  # CPython (simulator): only useful for the Counter, the fake label is trivial
+  import tracemalloc
+  if not tracemalloc.is_tracing():
+    tracemalloc.start()
+  return tracemalloc.get_traced_memory()[0]
+
+
+def _make_label():
+  return label.Label(terminalio.FONT, text="Score: 0", x=0, y=6)
+
+
+def _update_label(widget, value):
+  widget.text = "Score: {}".format(value)
+
+
+def _make_counter():
+  return Counter("Score: ", 5, x=0, y=6)
+
+
+def _update_counter(widget, value):
+  widget.set(value)
+
+
+def _measure(make, update, updates):
+  gc.collect()
+  before = _heap_used()
+  widget = make()
+  gc.collect()
+  ram = _heap_used() - before
+
+  start = time.monotonic_ns()
+  for value in range(updates):
+    update(widget, value)
+  elapsed = time.monotonic_ns() - start
+
+  gc.collect()
+  gc.disable()
+  before = _heap_used()
+  for value in range(updates, updates + ALLOC_UPDATES):
+    update(widget, value)
+  allocated = _heap_used() - before
+  gc.enable()
+  return {
+    "ram_bytes": ram,
+    "update_us": elapsed / updates / 1000,
+    "alloc_per_update": allocated / ALLOC_UPDATES,
+  }
+
+
+def run(updates=1000):
+  return {
+    "label": _measure(_make_label, _update_label, updates),
+    "counter": _measure(_make_counter, _update_counter, updates),
+  }
+
+
+def print_report(result):
+  for name in ("label", "counter"):
+    stats = result[name]
+    print(f"{name:8} {stats['ram_bytes']:6d} bytes held, {stats['update_us']:8.1f} us/update, {stats['alloc_per_update']:6.0f} bytes allocated/update")
@@ -0,0 +1,231 @@
+import struct
+import time
+
+# Binary input log: a header followed by fixed-size records
+#   header: b"RGIL" + version byte
+#   record: uint32 time in microseconds, uint8 kind, int16 value
+# Times are relative to the start of the current song (or to the start of the
+# recording before the first song).
+MAGIC = b"RGIL"
+VERSION = 1
+RECORD_FORMAT = "<IBh"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+FRAME = 0       # a display frame was rendered
+CLICKS = 1      # button edges in one input tick, value = bitmask of buttons
+FLICK = 2       # detect_flick() fired
+ROTARY = 3      # encoder moved, value = new position
+SONG_START = 4  # start_game() ran, value = track, times restart from here
+RELEASES = 5    # buttons let go in one input tick (holds), value = bitmask
+
+
+class InputRecorder:
+  """Records every input GameManager consumes so the run can be replayed"""
+
+  def __init__(self, filename="input_log.bin", buffer_records=256):
+    self.filename = filename
+    self.buffer = bytearray(RECORD_SIZE * buffer_records)
+    self.buffer_records = buffer_records
+    self.count = 0
+    self.origin = 0
+    self.now = 0
+    self.file = None
+
+  def start(self, game):
+    try:
+      self.file = open(self.filename, "wb")
+      self.file.write(MAGIC + bytes([VERSION]))
+    except OSError:
+      print("Failed to open input log")
+      self.file = None
+      return
+    self.origin = game.clock()
+    self.now = self.origin
+    self.count = 0
+    game.recorder = self
+
+  def stop(self, game):
+    game.recorder = None
+    if self.file is not None:
+      self.flush()
+      self.file.close()
+      self.file = None
+
+  def flush(self):
+    if self.count == 0:
+      return
+    try:
+      self.file.write(memoryview(self.buffer)[:self.count * RECORD_SIZE])
+    except OSError:
+      print("Failed to write input log")
+    self.count = 0
+
+  def _add(self, kind, value):
+    t = int((self.now - self.origin) * 1000000)
+    struct.pack_into(RECORD_FORMAT, self.buffer, self.count * RECORD_SIZE, t, kind, value)
+    self.count += 1
+    if self.count == self.buffer_records:
+      self.flush()
+
+  # hooks called by GameManager
+  def input_tick(self, now, clicked, released=None):
+    self.now = now
+    mask = 0
+    for i, was_clicked in enumerate(clicked):
+      if was_clicked:
+        mask |= 1 << i
+    if mask:
+      self._add(CLICKS, mask)
+    if released is not None:
+      mask = 0
+      for i, was_released in enumerate(released):
+        if was_released:
+          mask |= 1 << i
+      if mask:
+        self._add(RELEASES, mask)
+
+  def frame(self, now):
+    self.now = now
+    self._add(FRAME, 0)
+
+  def flick(self):
+    self._add(FLICK, 0)
+
+  def rotary(self, position):
+    self._add(ROTARY, position)
+
+  def song_start(self, track, song_start):
+    self.now = song_start
+    self._add(SONG_START, track)
+    self.origin = song_start
+
+
+class ReplayEncoder:
+  """Stands in for RotaryEncoder and reports the recorded positions"""
+
+  def __init__(self):
+    self.position = 0
+    self.pending = None
+    self.last_delta_position = 0
+
+  def update(self):
+    if self.pending is None or self.pending == self.position:
+      self.pending = None
+      return False
+    self.position = self.pending
+    self.pending = None
+    return True
+
+  def get_delta(self):
+    delta = self.position - self.last_delta_position
+    self.last_delta_position = self.position
+    return delta
+
+
+class InputReplay:
+  """Feeds an input log back into a GameManager on a virtual clock.
+
+  Frames and input ticks are replayed at exactly the recorded times, so the
+  same score, misses and level progression come out. With speed=0 the log is
+  replayed as fast as possible (for profiling), speed=1 is real time.
+  """
+
+  def __init__(self, filename="input_log.bin", chunk_records=64):
+    self.filename = filename
+    self.chunk = bytearray(RECORD_SIZE * chunk_records)
+    self.now = 0
+    self.flicked = False
+    self.flick_peak = 0.0  # not in the log
+    self.encoder = ReplayEncoder()
+
+  # GameManager reads the clock and the accelerometer through these
+  def clock(self):
+    return self.now
+
+  def detect_flick(self):
+    flicked = self.flicked
+    self.flicked = False
+    return flicked
+
+  def records(self):
+    with open(self.filename, "rb") as f:
+      header = f.read(len(MAGIC) + 1)
+      if header[:len(MAGIC)] != MAGIC or header[-1] != VERSION:
+        raise ValueError("not an input log: " + self.filename)
+      while True:
+        size = f.readinto(self.chunk)
+        if not size:
+          break
+        for offset in range(0, size - size % RECORD_SIZE, RECORD_SIZE):
+          yield struct.unpack_from(RECORD_FORMAT, self.chunk, offset)
+
+  def run(self, game, speed=0):
+    game.clock = self.clock
+    game.accelerometer = self
+    game.rotary_encoder = self.encoder
+    game.recorder = None
+    buttons = len(game.buttons)
+
+    origin = 0
+    pending = None  # [time, clicks mask, flick, rotary position, releases mask]
+    frames = 0
+    inputs = 0
+    wall_start = time.monotonic()
+
+    for t, kind, value in self.records():
+      if pending is not None and (kind in (FRAME, SONG_START) or t != pending[0]):
+        self._input(game, origin, pending, buttons, speed, wall_start)
+        pending = None
+        inputs += 1
+
+      if kind == FRAME:
+        self._wait(origin + t / 1000000, speed, wall_start)
+        game.frame_tick(self.now)
+        game.pixels.tick(self.now)
+        frames += 1
+      elif kind == SONG_START:
+        if game.state != "playing":
+          raise RuntimeError("replay diverged: song start while in " + game.state)
+        origin = game.song_start
+      else:
+        if pending is None:
+          pending = [t, 0, False, None, 0]
+        if kind == CLICKS:
+          pending[1] = value
+        elif kind == FLICK:
+          pending[2] = True
+        elif kind == ROTARY:
+          pending[3] = value
+        elif kind == RELEASES:
+          pending[4] = value
+
+    if pending is not None:
+      self._input(game, origin, pending, buttons, speed, wall_start)
+      inputs += 1
+
+    return {
+      "score": game.score,
+      "misses": game.misses,
+      "level": game.current_level,
+      "state": game.state,
+      "frames": frames,
+      "inputs": inputs,
+      "wall_time": time.monotonic() - wall_start,
+    }
+
+  def _wait(self, virtual_now, speed, wall_start):
+    self.now = virtual_now
+    if speed > 0:
+      delay = virtual_now / speed - (time.monotonic() - wall_start)
+      if delay > 0:
+        time.sleep(delay)
+
+  def _input(self, game, origin, pending, buttons, speed, wall_start):
+    t, mask, flicked, position, releases = pending
+    self._wait(origin + t / 1000000, speed, wall_start)
+    self.flicked = flicked
+    self.encoder.pending = position
+    for i in range(buttons):
+      game.released[i] = bool(releases & (1 << i))
+    clicked = [bool(mask & (1 << i)) for i in range(buttons)]
+    game.input_tick(self.now, clicked)
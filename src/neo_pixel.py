@@ -1,11 +1,110 @@
 import neopixel
 import board
 
+OFF = (0, 0, 0)
+
+# frame ids for the two frames that don't belong to an effect
+FRAME_OFF = -1
+FRAME_STEADY = -2
+
 class NeoPixel:
+  NUM_PIXELS = 5
+
+  # name: (color, duration in seconds, priority, style)
+  # a new effect only replaces a running one with the same or lower priority
+  EFFECTS = {
+    "hit": ((0, 255, 0), 0.15, 0, "flash"),
+    "combo": ((0, 80, 255), 0.4, 1, "pulse"),
+    "miss": ((255, 0, 0), 0.25, 2, "flash"),
+    "level": ((255, 180, 0), 0.6, 3, "sweep"),
+  }
+  LEVELS = 8  # brightness steps per effect, bounds the number of strip writes
+
   def __init__(self):
-    pixels = neopixel.NeoPixel(board.D10, 5, brightness=0.3, auto_write=True)
+    # auto_write is off so a whole frame goes out in a single show()
+    pixels = neopixel.NeoPixel(board.D10, self.NUM_PIXELS, brightness=0.3, auto_write=False)
     self.pixels = pixels
 
+    # every brightness step of every effect, built once so tick() never allocates
+    self.shades = {}
+    for name in self.EFFECTS:
+      color = self.EFFECTS[name][0]
+      self.shades[name] = [(color[0] * step // self.LEVELS, color[1] * step // self.LEVELS, color[2] * step // self.LEVELS)
+                           for step in range(self.LEVELS + 1)]
+
+    self.effect = None
+    self.effect_start = 0
+    # id of the last frame written: priority * 100 + step (or sweep position)
+    self.frame = FRAME_OFF
+    self.tick_interval = 1 / 50
+    self.last_tick = 0
+    self.writes = 0
+
   def set_color(self, r, g, b):
-    for i in range(len(self.pixels)):
-      self.pixels[i] = (r, g, b)
+    """Show a steady color right away, cancelling any running effect"""
+    self.effect = None
+    self.frame = FRAME_STEADY
+    self.pixels.fill((r, g, b))
+    self.pixels.show()
+    self.writes += 1
+
+  def start(self, effect, now):
+    """Queue an effect; it is drawn by the next tick() so repeated calls in a frame merge"""
+    if self.effect is not None and self.EFFECTS[self.effect][2] > self.EFFECTS[effect][2]:
+      return
+    self.effect = effect
+    self.effect_start = now
+
+  def flash_hit(self, now):
+    self.start("hit", now)
+
+  def flash_miss(self, now):
+    self.start("miss", now)
+
+  def pulse_combo(self, now):
+    self.start("combo", now)
+
+  def sweep_level_up(self, now):
+    self.start("level", now)
+
+  def tick(self, now):
+    """Advance the running effect, writes to the strip at most once per tick"""
+    if (now - self.last_tick) < self.tick_interval:
+      return
+    self.last_tick = now
+
+    effect = self.effect
+    if effect is None:
+      if self.frame == FRAME_OFF or self.frame == FRAME_STEADY:
+        return
+      frame = FRAME_OFF
+    else:
+      color, duration, priority, style = self.EFFECTS[effect]
+      progress = (now - self.effect_start) / duration
+      if progress >= 1:
+        self.effect = None
+        frame = FRAME_OFF
+      elif style == "sweep":
+        # one lit pixel travelling along the strip
+        frame = priority * 100 + int(progress * self.NUM_PIXELS)
+      else:
+        if style == "pulse":
+          level = 1 - abs(2 * progress - 1)
+        else:
+          level = 1 - progress
+        # quantize so a decay costs at most LEVELS writes
+        frame = priority * 100 + int(level * self.LEVELS)
+
+    if frame == self.frame:
+      return
+    self.frame = frame
+
+    if frame == FRAME_OFF:
+      self.pixels.fill(OFF)
+    elif style == "sweep":
+      self.pixels.fill(OFF)
+      self.pixels[frame % 100] = color
+    else:
+      self.pixels.fill(self.shades[effect][frame % 100])
+    self.pixels.show()
+    self.writes += 1
@@ -0,0 +1,111 @@
+class OverloadController:
+  """Sheds optional work while frames overrun their deadline during a song.
+
+  Every frame is checked against its budget (the frame interval): how late
+  it started (GC, a burst of input work or spawns before it) plus how long
+  its own update and display refresh took. After ESCALATE_AFTER frames over
+  budget in a row one more kind of work is shed, in this order:
+
+    1. HUD counter updates
+    2. LED effects
+    3. every other display refresh (the notes still move and are judged)
+
+  Input polling, accelerometer sampling and judgement are never shed. After
+  RECOVER_AFTER frames well within budget one level is restored. Every level
+  change is kept in a small ring of events (and sent to the telemetry) so a
+  song that fell behind shows when and by how much.
+  """
+
+  LEVEL_NAMES = ("full", "no HUD", "no LEDs", "half frames")
+  ESCALATE_AFTER = 3
+  RECOVER_AFTER = 60  # 2 s at 30 fps
+  CALM = 0.5  # share of the budget a frame must stay under to count as calm
+  EVENTS = 32
+
+  def __init__(self, game):
+    self.game = game
+    # ring of level changes, preallocated so recording never allocates
+    self.event_time = [0.0] * self.EVENTS
+    self.event_level = [0] * self.EVENTS
+    self.event_late = [0.0] * self.EVENTS
+    self.event_cost = [0.0] * self.EVENTS
+    self.level_frames = [0] * len(self.LEVEL_NAMES)
+    self.reset(0)
+
+  def reset(self, now):
+    """Back to full work, call when a song starts"""
+    self.origin = now
+    self.over = 0
+    self.calm = 0
+    self.event_index = 0
+    self.event_count = 0
+    self.escalations = 0
+    self.max_level = 0
+    self.skipped_refreshes = 0
+    for i in range(len(self.level_frames)):
+      self.level_frames[i] = 0
+    self.set_level(0)
+
+  def set_level(self, level):
+    self.level = level
+    self.shed_hud = level >= 1
+    self.shed_leds = level >= 2
+    self.shed_frames = level >= 3
+    self.render = True
+
+  def should_render(self):
+    """Whether this frame goes to the display"""
+    if self.shed_frames:
+      self.render = not self.render
+      if not self.render:
+        self.skipped_refreshes += 1
+    return self.render
+
+  def frame_done(self, now, late, cost):
+    """A frame that was due late seconds before now took cost seconds"""
+    self.level_frames[self.level] += 1
+    budget = self.game.visual_interval
+    spent = late + cost
+    if spent > budget:
+      self.calm = 0
+      self.over += 1
+      if self.over >= self.ESCALATE_AFTER and self.level < len(self.LEVEL_NAMES) - 1:
+        self.change(self.level + 1, now, late, cost)
+        self.escalations += 1
+        if self.level == 2:
+          # leave the strip dark rather than frozen mid effect
+          self.game.pixels.set_color(0, 0, 0)
+    else:
+      self.over = 0
+      if spent < budget * self.CALM:
+        self.calm += 1
+        if self.calm >= self.RECOVER_AFTER and self.level > 0:
+          self.change(self.level - 1, now, late, cost)
+
+  def change(self, level, now, late, cost):
+    self.set_level(level)
+    self.over = 0
+    self.calm = 0
+    if level > self.max_level:
+      self.max_level = level
+    i = self.event_index
+    self.event_time[i] = now - self.origin
+    self.event_level[i] = level
+    self.event_late[i] = late
+    self.event_cost[i] = cost
+    self.event_index = (i + 1) % self.EVENTS
+    if self.event_count < self.EVENTS:
+      self.event_count += 1
+    if self.game.telemetry is not None:
+      self.game.telemetry.degraded(level, late + cost)
+
+  def print_report(self):
+    if not self.escalations:
+      return
+    frames = ", ".join(f"{name} {n}" for name, n in zip(self.LEVEL_NAMES, self.level_frames))
+    print(f"Overload: {self.escalations} escalations, up to {self.LEVEL_NAMES[self.max_level]}, {self.skipped_refreshes} refreshes skipped")
+    print(f"Frames per level: {frames}")
+    start = (self.event_index - self.event_count) % self.EVENTS
+    for k in range(self.event_count):
+      i = (start + k) % self.EVENTS
+      print(f"  {self.event_time[i]:7.2f} s -> {self.LEVEL_NAMES[self.event_level[i]]}: started {self.event_late[i] * 1000:.1f} ms late, took {self.event_cost[i] * 1000:.1f} ms")
@@ -0,0 +1,116 @@
+import time
+
+
+class PowerGovernor:
+  """Lets the main loop sleep between ticks outside of gameplay.
+
+  While a song plays the loop runs flat out. On the menu and result screens
+  nothing moves unless the player does something, so the input and render
+  rates drop and the time until the next tick is spent in time.sleep(),
+  which idles the CPU. After DROWSY_AFTER seconds without input the rates
+  drop further; a button press or an encoder turn brings them back.
+
+  Naps never outlast the next input poll, so a press is seen within one
+  poll interval. rotaryio counts the encoder in hardware while we sleep and
+  the accelerometer FIFO (32 samples, 160 ms) outlasts the longest nap.
+  """
+
+  IDLE_INPUT_INTERVAL = 0.02
+  IDLE_FRAME_INTERVAL = 0.1
+  DROWSY_AFTER = 30  # seconds without input
+  DROWSY_INPUT_INTERVAL = 0.05
+  DROWSY_FRAME_INTERVAL = 0.5
+  MIN_NAP = 0.001  # shorter sleeps cost more than they save
+
+  def __init__(self, game):
+    self.game = game
+    # rates used while playing, restored when the game leaves idle
+    self.input_interval = game.input_interval
+    self.frame_interval = game.visual_interval
+    self.sleep = time.sleep  # the simulator swaps this out
+
+    self.idle = False
+    self.drowsy = False
+    self.last_input = 0
+    self.last_position = 0
+    self.reset_stats(0)
+
+  def reset_stats(self, now):
+    self.stats_start = now
+    self.slept = 0
+    self.naps = 0
+    self.wakeups = 0
+
+  def set_idle(self, idle, now):
+    """Switch between gameplay rates and idle rates"""
+    self.idle = idle
+    self.drowsy = False
+    self.last_input = now
+    self.last_position = self.game.rotary_encoder.position
+    if idle:
+      self.game.input_interval = self.IDLE_INPUT_INTERVAL
+      self.game.visual_interval = self.IDLE_FRAME_INTERVAL
+    else:
+      self.game.input_interval = self.input_interval
+      self.game.visual_interval = self.frame_interval
+
+  def input_seen(self, clicked, now):
+    """Call after an input tick, wakes from drowsy rates on any input"""
+    if now < self.last_input:
+      # the clock went backwards, so it was swapped (replay, simulator)
+      self.reset_stats(now)
+      self.last_input = now
+    active = self.game.rotary_encoder.position != self.last_position
+    for i in range(len(clicked)):
+      if clicked[i]:
+        active = True
+    if active:
+      self.last_position = self.game.rotary_encoder.position
+      self.wake(now)
+    elif not self.drowsy and now - self.last_input > self.DROWSY_AFTER:
+      self.drowsy = True
+      self.game.input_interval = self.DROWSY_INPUT_INTERVAL
+      self.game.visual_interval = self.DROWSY_FRAME_INTERVAL
+
+  def wake(self, now):
+    """Input arrived (a button, the encoder, a chart upload): back to idle
+    rates if drowsy"""
+    self.last_input = now
+    self.game.visual_update = 0  # show the result on the next loop, not a frame later
+    if self.drowsy:
+      self.drowsy = False
+      self.wakeups += 1
+      self.game.input_interval = self.IDLE_INPUT_INTERVAL
+      self.game.visual_interval = self.IDLE_FRAME_INTERVAL
+
+  def nap(self, now):
+    """Sleep until the next input poll, frame or LED step is due"""
+    game = self.game
+    wake = game.last_input_update + game.input_interval
+    frame = game.visual_update + game.visual_interval
+    if frame < wake:
+      wake = frame
+    pixels = game.pixels
+    if pixels.effect is not None:
+      step = pixels.last_tick + pixels.tick_interval
+      if step < wake:
+        wake = step
+    duration = wake - now
+    if duration >= self.MIN_NAP:
+      self.sleep(duration)
+      self.slept += game.clock() - now
+      self.naps += 1
+
+  def report(self, now):
+    """Duty cycle (share of time awake) since reset_stats(), a proxy for current draw"""
+    elapsed = max(now - self.stats_start, 1e-9)
+    return {
+      "seconds": elapsed,
+      "duty_cycle": 1 - self.slept / elapsed,
+      "naps": self.naps,
+      "wakeups": self.wakeups,
+    }
+
+  def print_report(self, now):
+    report = self.report(now)
+    print(f"Idle {report['seconds']:.0f} s: awake {report['duty_cycle'] * 100:.0f}% of the time, {report['naps']} naps, {report['wakeups']} wakeups")
@@ -0,0 +1,85 @@
+import time
+import digitalio
+
+try:
+  import rotaryio
+except ImportError:
+  rotaryio = None
+
+
+class RotaryEncoder:
+  """Quadrature rotary encoder counted in the background.
+
+  On boards with rotaryio the edges are counted by the firmware (pin-change
+  interrupts / PCNT), so fast spins don't drop detents and update() only reads
+  a counter. Without rotaryio it falls back to polling the two pins.
+  position is in detents, pulses_per_detent raw counts make one detent.
+  """
+
+  # quadrature transition table indexed by (previous_state << 2) | state
+  TRANSITIONS = (0, -1, 1, 0, 1, 0, 0, -1, -1, 0, 0, 1, 0, 1, -1, 0)
+
+  def __init__(self, pin_a, pin_b, debounce_ms=3, pulses_per_detent=3):
+    self.pulses_per_detent = pulses_per_detent
+    self.debounce = debounce_ms / 1000
+
+    if rotaryio is not None:
+      # divisor=1 so every edge is counted, detents are worked out below
+      self.encoder = rotaryio.IncrementalEncoder(pin_a, pin_b, divisor=1)
+      self.pin_a = None
+      self.pin_b = None
+    else:
+      self.encoder = None
+      self.pin_a = self._make_input(pin_a)
+      self.pin_b = self._make_input(pin_b)
+      self.state = self._read_state()
+      self.last_change = 0
+    self.raw = 0
+
+    self.position = 0
+    self.last_delta_position = 0
+
+  def _make_input(self, pin):
+    p = digitalio.DigitalInOut(pin)
+    p.direction = digitalio.Direction.INPUT
+    p.pull = digitalio.Pull.UP
+    return p
+
+  def _read_state(self):
+    return (self.pin_a.value << 1) | self.pin_b.value
+
+  def _poll(self):
+    # software fallback: decode one quadrature step per call
+    state = self._read_state()
+    if state != self.state:
+      now = time.monotonic()
+      if (now - self.last_change) >= self.debounce:
+        self.raw += self.TRANSITIONS[(self.state << 2) | state]
+        self.last_change = now
+      self.state = state
+
+  def update(self):
+    """Refresh position from the counter, returns True if it moved a detent"""
+    if self.encoder is not None:
+      self.raw = self.encoder.position
+    else:
+      self._poll()
+
+    position = self.raw // self.pulses_per_detent
+    if position != self.position:
+      self.position = position
+      return True
+    return False
+
+  def get_delta(self):
+    """Detents turned since the last call to get_delta()"""
+    delta = self.position - self.last_delta_position
+    self.last_delta_position = self.position
+    return delta
+
+  def reset(self):
+    if self.encoder is not None:
+      self.encoder.position = 0
+    self.raw = 0
+    self.position = 0
+    self.last_delta_position = 0
@@ -0,0 +1,94 @@
+# Song catalog: a text index on flash, one song per line
+#
+#   # track|bpm|title|charts
+#   1|88|Demo Song|demo.chart
+#   2|120|Second Song|second_easy.chart,second.chart,second_hard.chart
+#
+# track is the DFPlayer track number, charts are chart files (src/chart.py)
+# relative to the index, one per difficulty (Easy, Medium, Hard, Custom). A
+# song with fewer charts uses its last one for the harder difficulties.
+#
+# Only the byte offset of each song line stays in RAM. A song is parsed when
+# the song-select screen shows it and its chart is read when the game starts.
+
+import chart
+
+
+class Song:
+  def __init__(self, track, bpm, title, charts):
+    self.track = track
+    self.bpm = bpm
+    self.title = title
+    self.charts = charts
+
+  def chart_file(self, difficulty):
+    return self.charts[min(difficulty, len(self.charts) - 1)]
+
+
+def parse_line(line):
+  """Return a Song for an index line, None for blank/comment lines"""
+  line = line.strip()
+  if not line or line[0] == "#":
+    return None
+  fields = line.split("|")
+  if len(fields) != 4:
+    raise ValueError("bad song line: " + line)
+  charts = [name.strip() for name in fields[3].split(",") if name.strip()]
+  if not charts:
+    raise ValueError("song without a chart: " + line)
+  return Song(int(fields[0]), float(fields[1]), fields[2].strip(), charts)
+
+
+class SongCatalog:
+  def __init__(self, filename="songs/index.txt"):
+    """filename None (or a missing file) gives an empty catalog"""
+    self.filename = filename
+    self.folder = ""
+    if filename is not None and "/" in filename:
+      self.folder = filename[:filename.rfind("/") + 1]
+    self.offsets = self.scan()
+    self.cached_index = None
+    self.cached_song = None
+
+  def scan(self):
+    """Byte offset of every song line, the only per-song cost at boot.
+    Lines that don't parse are skipped."""
+    offsets = []
+    if self.filename is None:
+      return offsets
+    try:
+      with open(self.filename, "rb") as f:
+        offset = 0
+        while True:
+          line = f.readline()
+          if not line:
+            break
+          stripped = line.strip()
+          if stripped and stripped[0] != ord("#"):
+            try:
+              parse_line(line.decode("utf-8"))
+              offsets.append(offset)
+            except ValueError as error:  # UnicodeError is one too
+              print("Skipping song:", error)
+          offset += len(line)
+    except OSError:
+      print("No song catalog at", self.filename)
+    return offsets
+
+  def __len__(self):
+    return len(self.offsets)
+
+  def song(self, index):
+    """Read one song from the index, the last one read is kept. Raises
+    OSError or ValueError if the index changed since the scan."""
+    if index != self.cached_index:
+      with open(self.filename, "rb") as f:
+        f.seek(self.offsets[index])
+        self.cached_song = parse_line(f.readline().decode("utf-8"))
+      self.cached_index = index
+    return self.cached_song
+
+  def load_chart(self, index, difficulty):
+    """The beat map of a song for a difficulty, read from flash. Raises
+    OSError for a missing chart and ValueError for a bad one."""
+    return chart.load_chart(self.folder + self.song(index).chart_file(difficulty))
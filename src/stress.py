@@ -0,0 +1,257 @@
+import gc
+import time
+
+# Stress mode: synthetic dense charts played by an autoplay bot.
+# Runs on the device (set STRESS_TEST in code.py) and on the host through
+# tools/stress.py. The game is driven frame by frame on a virtual clock and
+# only the work inside each tick is timed.
+
+PATTERNS = ("stream", "chords", "flicks", "mixed", "holds", "multi")
+
+
+class SyntheticChart:
+  """A generated beat map that computes notes on demand instead of storing them.
+
+  Behaves like the list of (time, lane, type) tuples GameManager expects, so
+  a 100k note chart costs no RAM. nps is notes per second.
+  """
+
+  HOLD_SLOTS = 6  # length of a hold, in 1/nps steps
+
+  def __init__(self, pattern="stream", notes=1000, nps=8, start=2.0):
+    if pattern not in PATTERNS:
+      raise ValueError("unknown pattern: " + pattern)
+    self.pattern = pattern
+    self.notes = notes
+    self.nps = nps
+    self.start = start
+
+  def __len__(self):
+    return self.notes
+
+  def __getitem__(self, i):
+    if i < 0:
+      i += self.notes
+    if not 0 <= i < self.notes:
+      raise IndexError("chart index out of range")
+    if self.pattern == "mixed":
+      # cycle through 64-note sections of the other patterns; a flick
+      # section lasts twice as long because of the rests
+      cycle, j = divmod(i, 192)
+      section, k = divmod(j, 64)
+      slot, lane, note_type = self._note(PATTERNS[section], k)
+      slot += cycle * 256 + (0, 64, 128)[section]
+    else:
+      slot, lane, note_type = self._note(self.pattern, i)
+    if note_type == "hold":
+      return (self.start + slot / self.nps, lane, note_type, self.HOLD_SLOTS / self.nps)
+    return (self.start + slot / self.nps, lane, note_type)
+
+  def _note(self, pattern, i):
+    """(time in 1/nps steps, lane, type) of note i of a single pattern"""
+    if pattern == "stream":
+      # 1 2 3 4 3 2 1 2 ... one note at a time
+      step = i % 6
+      return (i, step + 1 if step < 4 else 7 - step, "tap")
+    if pattern == "chords":
+      # all four lanes at once, nps counts every note of the chord
+      return ((i // 4) * 4, i % 4 + 1, "tap")
+    if pattern == "multi":
+      # four inputs in one tick: four buttons, a flick across all four
+      # lanes, then two buttons and a flick across the other two lanes
+      group, lane = divmod(i, 4)
+      kind = group % 3
+      flick = kind == 1 or (kind == 2 and lane >= 2)
+      return (group * 4, lane + 1, "flick" if flick else "tap")
+    if pattern == "holds":
+      # overlapping holds walking across the lanes, each lane is let go
+      # for two steps before its next hold
+      return ((i // 4) * 8 + (i % 4) * 2, i % 4 + 1, "hold")
+    # flick bursts: 4 quick flicks across the lanes, then a rest of the same length
+    return ((i // 4) * 8 + i % 4, i % 4 + 1, "flick")
+
+  def __iter__(self):
+    for i in range(self.notes):
+      yield self[i]
+
+
+class FrameStats:
+  """Fixed-size histogram of tick times, so recording never allocates"""
+
+  BUCKET_US = 100
+  BUCKETS = 1000  # 0 - 100 ms, anything slower lands in the last bucket
+
+  def __init__(self):
+    self.histogram = [0] * self.BUCKETS
+    self.count = 0
+    self.total_us = 0
+    self.max_us = 0
+
+  def add(self, us):
+    bucket = us // self.BUCKET_US
+    if bucket >= self.BUCKETS:
+      bucket = self.BUCKETS - 1
+    self.histogram[bucket] += 1
+    self.count += 1
+    self.total_us += us
+    if us > self.max_us:
+      self.max_us = us
+
+  def percentile(self, p):
+    """Upper edge of the bucket holding the p-th percentile, in ms"""
+    target = self.count * p / 100
+    seen = 0
+    for bucket, n in enumerate(self.histogram):
+      seen += n
+      if n and seen >= target:
+        return (bucket + 1) * self.BUCKET_US / 1000
+    return 0
+
+
+class AutoPlayer:
+  """Hits every note at the moment its center crosses the hit line and lets
+  go of a hold just before its tail gets there.
+
+  Create it after start_game(), the note height depends on the difficulty.
+  """
+
+  def __init__(self, game):
+    self.game = game
+    self.next_note = 0
+    # notes spawn with their top edge at y=0 and reach HIT_Y after FALL_TIME,
+    # so their center crosses the hit line half a note earlier
+    visual = game.visual
+    self.lead = (visual.NOTE_H / 2) / (visual.SPEED * game.FPS)
+    self.release_at = [-1.0] * len(game.buttons)  # song time per lane, -1 when not holding
+
+  def inputs(self, song_now, clicked, released=None):
+    """Fill clicked (and released, for holds) for this tick, returns True
+    if a flick is due"""
+    if released is not None:
+      for i in range(len(released)):
+        released[i] = 0 <= self.release_at[i] <= song_now
+        if released[i]:
+          self.release_at[i] = -1.0
+    flick = False
+    beat_map = self.game.beat_map
+    while self.next_note < len(beat_map):
+      note = beat_map[self.next_note]
+      if note[0] - self.lead > song_now:
+        break
+      if len(note) > 2 and note[2] == "flick":
+        flick = True
+      else:
+        clicked[note[1] - 1] = True
+        if len(note) > 3:
+          # the head is pinned where it was hit, the tail then takes the
+          # hold's duration to get there
+          self.release_at[note[1] - 1] = note[0] - self.lead + note[3] - self.lead / 2
+      self.next_note += 1
+    return flick
+
+
+def _gc_marker():
+  """A value that goes up whenever the garbage collector has run"""
+  if hasattr(gc, "mem_free"):
+    return gc.mem_free()
+  # CPython: total number of collections so far
+  return sum(stats["collections"] for stats in gc.get_stats())
+
+
+def run(game, chart, difficulty=2, render=False, max_misses=None, renderer=None):
+  """Play chart with the autoplay bot and return timing statistics.
+
+  render=True also pushes every frame to the display (device only).
+  max_misses overrides the lose condition so the whole chart is played.
+  renderer switches the note renderer first ("sprites" or "bitmap").
+  """
+  if renderer is not None:
+    game.visual.set_renderer(renderer)
+  game.assign_beat_map(chart)
+  game.difficulty = difficulty
+  max_misses_before = game.max_misses
+  if max_misses is not None:
+    game.max_misses = max_misses
+
+  virtual = [0.0]
+  clock = game.clock
+  game.clock = lambda: virtual[0]
+  game.start_game(track=1)
+  bot = AutoPlayer(game)
+
+  stats = FrameStats()
+  input_stats = FrameStats()
+  gc_pauses = 0
+  gc_pause_max_us = 0
+  peak_notes = 0
+  peak_holds = 0
+  clicked = [False] * len(game.buttons)
+  end_time = chart[len(chart) - 1][0] + game.FALL_TIME + 1 if len(chart) else 0
+
+  gc.collect()
+  # input ticks and frames each keep their own exact cadence
+  next_input = 0.0
+  next_frame = 0.0
+  while game.state == "playing":
+    now = min(next_input, next_frame)
+    virtual[0] = now
+    song_now = now - game.song_start
+    if song_now > end_time:
+      break
+
+    if now == next_input:
+      for i in range(len(clicked)):
+        clicked[i] = False
+      if bot.inputs(song_now, clicked, game.released):
+        game.accelerometer.flicked = True
+
+      start = time.monotonic_ns()
+      game.input_tick(now, clicked)
+      input_stats.add((time.monotonic_ns() - start) // 1000)
+      next_input += game.input_interval
+
+    if now == next_frame and game.state == "playing":
+      before = _gc_marker()
+      start = time.monotonic_ns()
+      game.frame_tick(now)
+      if render:
+        game.bus.refresh_display(now)
+      us = (time.monotonic_ns() - start) // 1000
+      stats.add(us)
+      if _gc_marker() > before:
+        gc_pauses += 1
+        if us > gc_pause_max_us:
+          gc_pause_max_us = us
+      if game.visual.active_notes > peak_notes:
+        peak_notes = game.visual.active_notes
+      holds = sum(game.visual.lane_holds)
+      if holds > peak_holds:
+        peak_holds = holds
+      next_frame += game.visual_interval
+
+  game.clock = clock
+  game.max_misses = max_misses_before
+
+  return {
+    "renderer": game.visual.renderer,
+    "notes": len(chart),
+    "score": game.score,
+    "misses": game.misses,
+    "frames": stats.count,
+    "frame_mean_ms": stats.total_us / max(1, stats.count) / 1000,
+    "frame_p50_ms": stats.percentile(50),
+    "frame_p95_ms": stats.percentile(95),
+    "frame_p99_ms": stats.percentile(99),
+    "frame_max_ms": stats.max_us / 1000,
+    "input_p99_ms": input_stats.percentile(99),
+    "peak_notes": peak_notes,
+    "peak_holds": peak_holds,
+    "gc_pauses": gc_pauses,
+    "gc_pause_max_ms": gc_pause_max_us / 1000,
+  }
+
+
+def print_report(result):
+  print(f"{result['notes']} notes ({result['renderer']}): score {result['score']}, misses {result['misses']}, peak {result['peak_notes']} active notes ({result['peak_holds']} holds)")
+  print(f"frame ms: mean {result['frame_mean_ms']:.2f} p50 {result['frame_p50_ms']:.1f} p95 {result['frame_p95_ms']:.1f} p99 {result['frame_p99_ms']:.1f} max {result['frame_max_ms']:.1f}")
+  print(f"input p99 {result['input_p99_ms']:.1f} ms, {result['gc_pauses']} GC pauses (worst {result['gc_pause_max_ms']:.1f} ms)")
@@ -0,0 +1,156 @@
+import gc
+import struct
+import sys
+
+# Session telemetry: one block per song, appended to a binary file on flash
+#   block header: b"RGTL" + version byte, build label (16 bytes), CircuitPython
+#                 version (3 bytes), track, difficulty, record count, dropped
+#   record: uint32 song time in microseconds, uint8 kind, uint8 lane,
+#           int16 value, uint16 beat index
+# Records are packed into a preallocated buffer while the song plays and the
+# block is written in one go when the song ends, never mid-song. When the
+# buffer is full further records are dropped and counted in the header.
+# tools/telemetry_report.py reads the logs on the host.
+MAGIC = b"RGTL"
+VERSION = 1
+HEADER_FORMAT = "<4sB16s3BBBHH"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+RECORD_FORMAT = "<IBBhH"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+BUILD = "dev"  # set for each firmware build, the report compares builds by it
+
+# kinds; the record time is in microseconds, the value fields of HIT, MISS,
+# HOLD_END, FRAME, GC, DEGRADE and OVERRUN are in 0.1 ms units, FLICK's in
+# 0.01 m/s^2
+HIT = 0        # value = offset from the hit line, + late, - early
+MISS = 1       # value = 0 passed the hit line or dropped, > 0 hold let go this early
+HOLD_END = 2   # a hold ended, value = how early it was let go (0 held through)
+FLICK = 3      # a flick fired, value = high-pass peak in 0.01 m/s^2, lane 255 = no note
+FRAME = 4      # every FRAME_EVERY-th frame, value = frame time, beat = notes spawned so far
+GC = 5         # lane 0 = collected at a safe point, 1 = by the allocator;
+               # value = time spent (the whole frame for lane 1)
+DEGRADE = 6    # the overload controller changed level, lane = new level,
+               # value = lateness plus cost of the frame that caused it
+OVERRUN = 7    # a frame over the budget, value = frame time, beat as FRAME
+
+NO_LANE = 255
+
+
+class Telemetry:
+  """Records one session per song: judgements, flicks, frame times and GC.
+
+  Every FRAME_EVERY-th frame is sampled as FRAME, every frame over the frame
+  budget is recorded as OVERRUN too, so the samples stay a fair share of all
+  frames. Recording never allocates: records go into the buffer with
+  struct.pack_into and all values are ints or floats.
+  """
+
+  FRAME_EVERY = 8
+
+  def __init__(self, filename="telemetry.bin", build=BUILD, records=1024):
+    self.filename = filename
+    self.build = build.encode()[:16]
+    self.buffer = bytearray(RECORD_SIZE * records)
+    self.records = records
+    self.count = 0
+    self.dropped = 0
+    self.recording = False
+    self.origin = 0
+    self.now = 0
+    self.track = 0
+    self.difficulty = 0
+    self.frames = 0
+    self.budget = 0
+    self.units_per_second = 1
+    self.heap_free = 0
+    self.game = None
+
+  def start(self, game):
+    game.telemetry = self
+    game.visual.telemetry = self
+    self.game = game
+    # note offsets come in note position units (see GameManager.HOLD_SCALE)
+    self.units_per_second = game.HOLD_SCALE
+
+  def stop(self, game):
+    game.telemetry = None
+    game.visual.telemetry = None
+    self.flush()
+
+  def _add(self, kind, lane, value, beat):
+    if not self.recording:
+      return
+    if self.count == self.records:
+      self.dropped += 1
+      return
+    t = int((self.now - self.origin) * 1000000)
+    if beat > 65535:
+      beat = 65535
+    if value > 32767:
+      value = 32767
+    elif value < -32768:
+      value = -32768
+    struct.pack_into(RECORD_FORMAT, self.buffer, self.count * RECORD_SIZE, t, kind, lane, value, beat)
+    self.count += 1
+
+  # hooks called by GameManager
+  def song_start(self, track, difficulty, now):
+    self.origin = now
+    self.now = now
+    self.track = track
+    self.difficulty = difficulty
+    self.count = 0
+    self.dropped = 0
+    self.frames = 0
+    self.budget = self.game.visual_interval
+    self.heap_free = gc.mem_free() if hasattr(gc, "mem_free") else 0
+    self.recording = True
+
+  def tick(self, now):
+    self.now = now
+
+  def frame(self, seconds):
+    """A frame (render and display refresh) took this long"""
+    self.frames += 1
+    if self.frames % self.FRAME_EVERY == 0:
+      self._add(FRAME, NO_LANE, int(seconds * 10000), self.game.beat_index)
+    if seconds > self.budget:
+      self._add(OVERRUN, NO_LANE, int(seconds * 10000), self.game.beat_index)
+    if self.heap_free:
+      free = gc.mem_free()
+      if free > self.heap_free:
+        # the heap grew back without a gc.collect() of ours
+        self._add(GC, 1, int(seconds * 10000), self.game.beat_index)
+      self.heap_free = free
+
+  def collected(self, seconds):
+    """The game collected garbage at a safe point"""
+    self._add(GC, 0, int(seconds * 10000), self.game.beat_index)
+    if self.heap_free:
+      self.heap_free = gc.mem_free()
+
+  def degraded(self, level, seconds):
+    self._add(DEGRADE, level, int(seconds * 10000), self.game.beat_index)
+
+  def flick(self, lane, peak):
+    self._add(FLICK, lane, int(peak * 100), self.game.beat_index)
+
+  # hooks called by Visuals, offset in note position units
+  def judge(self, kind, lane, offset, beat):
+    self._add(kind, lane, int(offset * 10000 / self.units_per_second), beat)
+
+  def flush(self):
+    """Append the session to the log, call when the song has ended"""
+    if not self.recording:
+      return
+    self.recording = False
+    version = sys.implementation.version
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, self.build, version[0], version[1], version[2],
+                         self.track, self.difficulty, self.count, self.dropped)
+    try:
+      with open(self.filename, "ab") as f:
+        f.write(header)
+        f.write(memoryview(self.buffer)[:self.count * RECORD_SIZE])
+    except OSError:
+      print("Failed to write telemetry")
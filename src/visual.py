@@ -5,19 +5,114 @@ import i2cdisplaybus
 import adafruit_displayio_ssd1306
 import board
 import terminalio
+import bitmaptools
+import telemetry
+import chart
+
+
+class Note:
+  """One pooled note, reused for every note that lands in its slot.
+
+  tile is its sprite with the "sprites" renderer and None with "bitmap",
+  where the note is drawn into the playfield at column x.
+  """
+
+  def __init__(self, tile, x):
+    self.tile = tile
+    self.x = x
+    self.y = 0  # in 1/SUBPIXEL pixels so the position stays an integer
+    self.flick = False
+    self.active = False
+    self.hold = False
+    self.length = 0  # hold body, in 1/SUBPIXEL pixels like y
+    self.holding = False  # a hold whose head was hit and is still held
+    self.parts = None  # HoldParts of a hold with the "sprites" renderer
+    self.beat = 0  # index in the beat map, for telemetry
+
+
+class HoldParts:
+  """The body and tail sprites of a hold note, pooled per lane.
+
+  The head is the note's own tile. The body is a one column TileGrid of
+  1 pixel tall tiles, so a new body length sets a tile or two and a
+  falling hold only moves its three sprites.
+  """
+
+  def __init__(self, body, tail):
+    self.body = body
+    self.tail = tail
+    self.rows = 0  # body tiles showing, counted up from the bottom one
+    self.note = None  # the hold these belong to, None when free
+
+
+class Counter:
+  """A HUD number as one TileGrid over the font's glyph sheet.
+
+  The prefix tiles are set once; set() only changes the digit tile indices,
+  so an update builds no string and lays nothing out. Values that don't fit
+  in `digits` show as all nines.
+  """
+
+  def __init__(self, prefix, digits, x, y, font=terminalio.FONT):
+    width, height = font.get_bounding_box()[:2]
+    palette = displayio.Palette(2)
+    palette[0] = 0x000000
+    palette[1] = 0xFFFFFF
+    palette.make_transparent(0)
+    # y is the middle of the line, like label.Label
+    self.tiles = displayio.TileGrid(font.bitmap, pixel_shader=palette, x=x, y=y - height // 2,
+                                    width=len(prefix) + digits, height=1,
+                                    tile_width=width, tile_height=height)
+    for i in range(len(prefix)):
+      self.tiles[i] = font.get_glyph(ord(prefix[i])).tile_index
+    self.blank = font.get_glyph(ord(" ")).tile_index
+    for i in range(digits):
+      self.tiles[len(prefix) + i] = self.blank
+    self.glyphs = [font.get_glyph(ord("0") + digit).tile_index for digit in range(10)]
+    self.first = len(prefix)
+    self.digits = digits
+    self.max_value = 10 ** digits - 1
+    self.value = None
+
+  def set(self, value):
+    if value == self.value:
+      return
+    self.value = value
+    value = min(max(value, 0), self.max_value)
+    length = 1
+    scale = 10
+    while value >= scale:
+      length += 1
+      scale *= 10
+    # left aligned like the labels were: digits, then blanks
+    for i in range(self.digits - 1, length - 1, -1):
+      self.tiles[self.first + i] = self.blank
+    for i in range(length - 1, -1, -1):
+      self.tiles[self.first + i] = self.glyphs[value % 10]
+      value //= 10
 
 
 class Visuals:
   W = 128
   H = 64
-  LANES = 4
+  LANES = chart.LANES
   LANE_W = W // LANES
   HIT_Y = 56
   NOTE_W = LANE_W - 6
   NOTE_H = 6
+  NOTE_HEIGHTS = [12, 9, 6, 6]  # per difficulty: Easy, Medium, Hard, Custom
   SPEED = 1.5 
+  SUBPIXEL = 4  # note positions are kept in quarter pixels
+  LANE_CAPACITY = 12  # pooled notes per lane: 64px / 6px notes on Hard
+  HOLD_CAPACITY = 4  # holds on screen at once per lane, with both renderers
+  HOLD_BODY_W = 8
+  HOLD_TAIL_H = 2
+  HOLD_BODY_X = (NOTE_W - HOLD_BODY_W) // 2
+
+  # judge() results
+  HIT = 1
+  HOLD = 2  # the head of a hold, judged again when it is let go
 
-  notes = []
   difficulty_names = ["Easy", "Medium", "Hard", "Custom", "High Scores"]
   
   MAX_LINES = 5
@@ -27,19 +122,31 @@ class Visuals:
   GAME_OVER_LINES = ["GAME OVER", "", "Score: ", "Misses: ", "Press any button"]
   rendering = ""
 
-  def __init__(self, i2c):
+  RENDERERS = ("sprites", "bitmap")
+
+  def __init__(self, i2c, renderer="sprites"):
+    """renderer "sprites": one TileGrid per pooled note, moved every frame.
+    "bitmap": a single playfield bitmap where only the rows a note enters
+    or leaves are redrawn, the cost is bounded by screen area."""
+    if renderer not in self.RENDERERS:
+      raise ValueError("unknown renderer: " + renderer)
+    self.renderer = renderer
+    self.telemetry = None  # judgements are reported here, see Telemetry.start
     displayio.release_displays()
 
     display_bus = i2cdisplaybus.I2CDisplayBus(i2c, device_address=0x3C)
     display = adafruit_displayio_ssd1306.SSD1306(display_bus, width=self.W, height=self.H)
     root = displayio.Group()
     display.root_group = root
+    self.display = display
     self.root = root
+    self.menu_index = None
 
     self.background()
     self.note_group()
     self.ui()
     self.text_display()
+    self.build_note_pool()
 
   def center_text(self, text_label, line_number):
     """Helper function to center text horizontally and position vertically
@@ -114,119 +221,480 @@ class Visuals:
     self.root.append(ui)
     self.ui_group = ui
     
-    # Create all UI elements as class attributes
-    score_label = label.Label(terminalio.FONT, text="Game", x=0, y=6)
-    miss_label = label.Label(terminalio.FONT, text="", x=0, y=16)
-    level_label = label.Label(terminalio.FONT, text="", x=77, y=6)  # Moved left from 90 to 70
-    
-    # Store as class attributes
-    self.score_label = score_label
-    self.miss_label = miss_label
-    self.level_label = level_label
+    # Counters redraw by swapping glyph tiles, see Counter
+    self.score_counter = Counter("Score: ", 5, x=0, y=6)
+    self.miss_counter = Counter("Miss: ", 3, x=0, y=16)
+    self.level_counter = Counter("Level: ", 2, x=77, y=6)  # Moved left from 90 to 70
 
-    ui.append(score_label)
-    ui.append(miss_label)
-    ui.append(level_label)
+    ui.append(self.score_counter.tiles)
+    ui.append(self.miss_counter.tiles)
+    ui.append(self.level_counter.tiles)
 
-  # function to spawn a note in a given lane (only spawn at the top of the screen)
-  def spawn_note_in_lane(self, lane, note_type="tap"):
-    # figure out x and y position offset by 3 since note_w is smaller than lane_w by 6
-    x = (lane - 1) * self.LANE_W + 3
-    y = 0
-
-    # create bitmap and tilegrid for the note
-    bm = displayio.Bitmap(self.NOTE_W, self.NOTE_H, 2)
-    pal2 = displayio.Palette(2)
-    pal2[0] = 0x000000
-    pal2[1] = 0xFFFFFF
-
-    # render the bitmap using this palette at x and y 
-    # (we're rendering from the top left corner)
-    tile = displayio.TileGrid(bm, pixel_shader=pal2, x=x, y=y)
-
-    # Different visual patterns for different note types
-    if note_type == "flick":
-      # Flick notes: hollow rectangle with arrow pattern
-      # Draw border
-      for bitmap_x in range(self.NOTE_W):
-        bm[bitmap_x, 0] = 1  # top
-        bm[bitmap_x, self.NOTE_H-1] = 1  # bottom
+  def build_note_pool(self, capacity=None):
+    """Preallocate every note sprite for the current note height.
+
+    Each lane is a ring buffer of LANE_CAPACITY notes. Notes in a lane fall at
+    the same speed, so they leave in the order they were spawned and the
+    oldest note is always at the head. Nothing is allocated while playing.
+    Called again by set_difficulty() since the note height changes.
+    """
+    if capacity is not None:
+      self.LANE_CAPACITY = capacity
+    while len(self.note_group):
+      self.note_group.pop()
+
+    # one sprite sheet for all notes: tile 0 = tap, tile 1 = flick, tile 2 = hold head
+    sheet = displayio.Bitmap(self.NOTE_W, self.NOTE_H * 3, 2)
+    pal = displayio.Palette(2)
+    pal[0] = 0x000000
+    pal[1] = 0xFFFFFF
+
+    # Regular tap notes: solid rectangle
+    for bitmap_x in range(self.NOTE_W):
       for bitmap_y in range(self.NOTE_H):
-        bm[0, bitmap_y] = 1  # left
-        bm[self.NOTE_W-1, bitmap_y] = 1  # right
-      
-      # Draw upward arrow pattern in middle (if note is tall enough)
-      if self.NOTE_H >= 5:
-        mid_x = self.NOTE_W // 2
-        bm[mid_x, 2] = 1  # arrow tip
-        if self.NOTE_W >= 5:
-          bm[mid_x-1, 3] = 1  # left wing
-          bm[mid_x+1, 3] = 1  # right wing
+        sheet[bitmap_x, bitmap_y] = 1
+
+    # Flick notes: hollow rectangle with arrow pattern
+    top = self.NOTE_H
+    for bitmap_x in range(self.NOTE_W):
+      sheet[bitmap_x, top] = 1  # top
+      sheet[bitmap_x, top + self.NOTE_H-1] = 1  # bottom
+    for bitmap_y in range(self.NOTE_H):
+      sheet[0, top + bitmap_y] = 1  # left
+      sheet[self.NOTE_W-1, top + bitmap_y] = 1  # right
+
+    # Draw upward arrow pattern in middle (if note is tall enough)
+    if self.NOTE_H >= 5:
+      mid_x = self.NOTE_W // 2
+      sheet[mid_x, top + 2] = 1  # arrow tip
+      if self.NOTE_W >= 5:
+        sheet[mid_x-1, top + 3] = 1  # left wing
+        sheet[mid_x+1, top + 3] = 1  # right wing
+
+    # Hold heads: solid rectangle split by a gap row
+    top = self.NOTE_H * 2
+    for bitmap_x in range(self.NOTE_W):
+      for bitmap_y in range(self.NOTE_H):
+        if bitmap_y != self.NOTE_H // 2:
+          sheet[bitmap_x, top + bitmap_y] = 1
+
+    self.sheet = sheet
+    self.playfield = None
+    if self.renderer == "bitmap":
+      # every note is drawn into this, transparent so the lane lines show
+      self.playfield = displayio.Bitmap(self.W, self.H, 2)
+      field_pal = displayio.Palette(2)
+      field_pal[0] = 0x000000
+      field_pal[1] = 0xFFFFFF
+      field_pal.make_transparent(0)
+      self.note_group.append(displayio.TileGrid(self.playfield, pixel_shader=field_pal))
+
+    self.lanes = []
+    for lane in range(self.LANES):
+      x = lane * self.LANE_W + 3
+      slots = []
+      for _ in range(self.LANE_CAPACITY):
+        tile = None
+        if self.playfield is None:
+          tile = displayio.TileGrid(sheet, pixel_shader=pal, x=x, y=0,
+                                    tile_width=self.NOTE_W, tile_height=self.NOTE_H)
+          tile.hidden = True
+          self.note_group.append(tile)
+        slots.append(Note(tile, x))
+      self.lanes.append(slots)
+    self.build_hold_parts(pal)
+    self.lane_head = [0] * self.LANES
+    self.lane_count = [0] * self.LANES
+    self.lane_dirty = [False] * self.LANES  # bitmap renderer: redraw the whole lane
+    self.lane_holds = [0] * self.LANES  # holds on screen per lane
+    self.holding = [None] * self.LANES  # the hold held down in each lane
+    self.holds_done = 0  # holds held to the end, collected by the game each frame
+    # what judge() found per lane: HIT, HOLD or 0 for the button, and
+    # whether the flick hit a note there
+    self.tap_results = [0] * self.LANES
+    self.flick_results = [False] * self.LANES
+    self.active_notes = 0
+    self.note_step = int(self.SPEED * self.SUBPIXEL)  # movement per frame
+
+  def build_hold_parts(self, pal):
+    """Sprites renderer: HOLD_CAPACITY body and tail sprites per lane"""
+    self.hold_parts = []
+    if self.playfield is not None:
+      return
+    tail_sheet = displayio.Bitmap(self.NOTE_W, self.HOLD_TAIL_H, 2)
+    tail_sheet.fill(1)
+    # body tile 0 is transparent so the lane shows, tile 1 is solid
+    body_sheet = displayio.Bitmap(self.HOLD_BODY_W, 2, 2)
+    for bitmap_x in range(self.HOLD_BODY_W):
+      body_sheet[bitmap_x, 1] = 1
+    body_pal = displayio.Palette(2)
+    body_pal[0] = 0x000000
+    body_pal[1] = 0xFFFFFF
+    body_pal.make_transparent(0)
+    for lane in range(self.LANES):
+      x = lane * self.LANE_W + 3
+      parts = []
+      for _ in range(self.HOLD_CAPACITY):
+        body = displayio.TileGrid(body_sheet, pixel_shader=body_pal, x=x + self.HOLD_BODY_X, y=0,
+                                  width=1, height=self.H, tile_width=self.HOLD_BODY_W, tile_height=1)
+        tail = displayio.TileGrid(tail_sheet, pixel_shader=pal, x=x, y=0)
+        body.hidden = True
+        tail.hidden = True
+        self.note_group.append(body)
+        self.note_group.append(tail)
+        parts.append(HoldParts(body, tail))
+      self.hold_parts.append(parts)
+
+  def set_renderer(self, renderer):
+    """Switch render engine, rebuilds the note pool (not while playing)"""
+    if renderer not in self.RENDERERS:
+      raise ValueError("unknown renderer: " + renderer)
+    if renderer != self.renderer:
+      self.renderer = renderer
+      self.build_note_pool()
+
+  def clear_notes(self):
+    """Hide every note and empty the lanes, the sprites stay pooled"""
+    for lane in range(self.LANES):
+      slots = self.lanes[lane]
+      for i in range(self.LANE_CAPACITY):
+        slots[i].active = False
+        slots[i].holding = False
+        slots[i].parts = None
+        if slots[i].tile is not None:
+          slots[i].tile.hidden = True
+      self.lane_head[lane] = 0
+      self.lane_count[lane] = 0
+      self.lane_holds[lane] = 0
+      self.holding[lane] = None
+    for parts in self.hold_parts:
+      for i in range(self.HOLD_CAPACITY):
+        parts[i].body.hidden = True
+        parts[i].tail.hidden = True
+        parts[i].note = None
+    if self.playfield is not None:
+      self.playfield.fill(0)
+    self.active_notes = 0
+    self.holds_done = 0
+
+  def draw_note(self, note, old_top):
+    """Bitmap renderer: move a note's pixels from row old_top (-1 if it isn't
+    drawn yet) to its current row, touching only rows that change"""
+    top = note.y // self.SUBPIXEL
+    x = note.x
+    h = self.NOTE_H
+    if old_top >= 0:
+      # rows the note moved out of
+      end = min(top, old_top + h, self.H)
+      if old_top < end:
+        bitmaptools.fill_region(self.playfield, x, old_top, x + self.NOTE_W, end, 0)
+    if top >= self.H:
+      return
+    rows = min(h, self.H - top)
+    if note.flick or old_top < 0:
+      # the hollow flick sprite differs row by row, copy it whole
+      first = h if note.flick else 0
+      bitmaptools.blit(self.playfield, self.sheet, x, top, x1=0, y1=first, x2=self.NOTE_W, y2=first + rows)
+    else:
+      # a solid note only needs the rows it moved into
+      start = max(top, old_top + h)
+      if start < top + rows:
+        bitmaptools.fill_region(self.playfield, x, start, x + self.NOTE_W, top + rows, 1)
+
+  def draw_hold(self, note):
+    """Bitmap renderer: draw a whole hold, only done by the lane strip redraw"""
+    top = note.y // self.SUBPIXEL
+    tail = top - note.length // self.SUBPIXEL - self.HOLD_TAIL_H
+    x = note.x
+    start = max(tail + self.HOLD_TAIL_H, 0)
+    if start < top:
+      body_x = x + self.HOLD_BODY_X
+      bitmaptools.fill_region(self.playfield, body_x, start, body_x + self.HOLD_BODY_W, top, 1)
+    start = max(tail, 0)
+    if start < tail + self.HOLD_TAIL_H:
+      bitmaptools.fill_region(self.playfield, x, start, x + self.NOTE_W, tail + self.HOLD_TAIL_H, 1)
+    first = self.NOTE_H * 2
+    bitmaptools.blit(self.playfield, self.sheet, x, top, x1=0, y1=first, x2=self.NOTE_W,
+                     y2=first + min(self.NOTE_H, self.H - top), skip_source_index=0)
+
+  def place_hold(self, note):
+    """Sprites renderer: line a hold's body and tail up with its head"""
+    parts = note.parts
+    top = note.y // self.SUBPIXEL
+    length = note.length // self.SUBPIXEL
+    parts.body.y = top - self.H
+    parts.tail.y = top - length - self.HOLD_TAIL_H
+    rows = min(length, self.H)
+    body = parts.body
+    # only the tiles where the length changed are set
+    while parts.rows < rows:
+      parts.rows += 1
+      body[self.H - parts.rows] = 1
+    while parts.rows > rows:
+      body[self.H - parts.rows] = 0
+      parts.rows -= 1
+
+  def hold_held(self, note):
+    """A held hold: the head stays put and the body is used up.
+    Returns True once the tail reaches the head."""
+    note.length -= self.note_step
+    if note.length <= 0:
+      if self.telemetry is not None:
+        self.telemetry.judge(telemetry.HOLD_END, note.x // self.LANE_W, 0, note.beat)
+      self.remove_note(note)
+      self.holds_done += 1
+      return True
+    return False
+
+  def scroll_lane(self, lane, slots, head, count):
+    """Bitmap renderer: move one lane's notes down, returns how many were missed"""
+    step = self.note_step
+    bottom = self.H * self.SUBPIXEL
+    height = self.NOTE_H * self.SUBPIXEL
+    # notes that overlap (a chart that crowds a lane) would erase each other's
+    # rows, then the whole lane strip is redrawn instead. So is a lane where a
+    # note was erased, it may have overlapped the one next to it, and a lane
+    # with a hold, whose tail and body move separately.
+    overlap = self.lane_dirty[lane] or self.lane_holds[lane] > 0
+    self.lane_dirty[lane] = False
+    below = bottom + height
+    for k in range(count):
+      note = slots[(head + k) % self.LANE_CAPACITY]
+      if note.active:
+        if below - note.y < height:
+          overlap = True
+        below = note.y
+
+    missed = 0
+    if overlap:
+      x = slots[0].x
+      bitmaptools.fill_region(self.playfield, x, 0, x + self.NOTE_W, self.H, 0)
+    # oldest (lowest) note first, its rows are cleared before the next one moves in
+    for k in range(count):
+      note = slots[(head + k) % self.LANE_CAPACITY]
+      if note.active:
+        if note.holding:
+          if not self.hold_held(note):
+            self.draw_hold(note)
+          continue
+        if note.y + step > bottom:
+          # past the bottom of the screen: missed, erased where it was drawn
+          self.missed(lane, note)
+          missed += 1
+          continue
+        old_top = note.y // self.SUBPIXEL
+        note.y += step
+        if note.hold:
+          self.draw_hold(note)
+        elif overlap:
+          top = note.y // self.SUBPIXEL
+          first = self.NOTE_H if note.flick else 0
+          bitmaptools.blit(self.playfield, self.sheet, note.x, top, x1=0, y1=first, x2=self.NOTE_W,
+                           y2=first + min(self.NOTE_H, self.H - top), skip_source_index=0)
+        else:
+          self.draw_note(note, old_top)
+    return missed
+
+  def erase_note(self, note):
+    self.lane_dirty[note.x // self.LANE_W] = True
+    top = note.y // self.SUBPIXEL
+    end = min(top + self.NOTE_H, self.H)
+    if note.hold:
+      # up to the tail
+      top = max(top - note.length // self.SUBPIXEL - self.HOLD_TAIL_H, 0)
+    if top < end:
+      bitmaptools.fill_region(self.playfield, note.x, top, note.x + self.NOTE_W, end, 0)
+
+  # function to spawn a note in a given lane (only spawn at the top of the screen)
+  def spawn_note_in_lane(self, lane, note_type="tap", length=0, beat=0):
+    """Returns False if the lane is full (the chart overlaps itself), or
+    already has HOLD_CAPACITY holds for a hold, with either renderer.
+    length is the body of a hold in 1/SUBPIXEL pixels, beat the note's
+    index in the beat map."""
+    lane -= 1
+    count = self.lane_count[lane]
+    if count == self.LANE_CAPACITY:
+      return False
+    hold = note_type == "hold"
+    if hold and self.lane_holds[lane] == self.HOLD_CAPACITY:
+      return False
+    parts = None
+    if hold and self.playfield is None:
+      # one is free, lane_holds counts the parts in use
+      for i in range(self.HOLD_CAPACITY):
+        if self.hold_parts[lane][i].note is None:
+          parts = self.hold_parts[lane][i]
+          break
+    note = self.lanes[lane][(self.lane_head[lane] + count) % self.LANE_CAPACITY]
+    note.y = 0
+    note.flick = note_type == "flick"
+    note.hold = hold
+    note.length = length
+    note.holding = False
+    note.beat = beat
+    note.active = True
+    if hold:
+      self.lane_holds[lane] += 1
+    if self.playfield is not None:
+      if hold:
+        self.lane_dirty[lane] = True  # drawn by the strip redraw
+      else:
+        self.draw_note(note, -1)
     else:
-      # Regular tap notes: solid rectangle
-      for bitmap_x in range(self.NOTE_W):
-        for bitmap_y in range(self.NOTE_H):
-          bm[bitmap_x, bitmap_y] = 1
+      note.tile[0] = 2 if hold else 1 if note.flick else 0
+      note.tile.y = 0
+      note.tile.hidden = False
+      if parts is not None:
+        parts.note = note
+        note.parts = parts
+        self.place_hold(note)
+        parts.body.hidden = False
+        parts.tail.hidden = False
+    self.lane_count[lane] = count + 1
+    self.active_notes += 1
+    return True
+
+  def missed(self, lane, note):
+    if self.telemetry is not None:
+      self.telemetry.judge(telemetry.MISS, lane, 0, note.beat)
+    self.remove_note(note)
 
-    # add the note to the notes array and the note group
-    self.notes.append({"lane": lane - 1, "y": y, "sprite": tile, "type": note_type})
-    # add the note sprite to the note group for rendering
-    self.note_group.append(tile)
+  def remove_note(self, note):
+    note.active = False
+    if self.playfield is not None:
+      self.erase_note(note)
+    else:
+      note.tile.hidden = True
+      if note.parts is not None:
+        note.parts.body.hidden = True
+        note.parts.tail.hidden = True
+        note.parts.note = None
+        note.parts = None
+    if note.hold:
+      lane = note.x // self.LANE_W
+      self.lane_holds[lane] -= 1
+      if note.holding:
+        note.holding = False
+        self.holding[lane] = None
+    self.active_notes -= 1
 
   # update the notes falling
   def update_notes(self):
     missed = 0
-    # update position of each active note to move down with speed
-    for note in self.notes[:]:
-        # calculate new position and render it
-        note["y"] += self.SPEED
-        note["sprite"].y = int(note["y"])
-
-        # check if the note has gone past the hit line (missed)
-        if note["y"] > self.H:
-            self.note_group.remove(note["sprite"])
-            self.notes.remove(note)
-            missed += 1
+    step = self.note_step
+    bottom = self.H * self.SUBPIXEL
+    for lane in range(self.LANES):
+      slots = self.lanes[lane]
+      head = self.lane_head[lane]
+      count = self.lane_count[lane]
+      if self.playfield is not None:
+        missed += self.scroll_lane(lane, slots, head, count)
+      else:
+        # update position of each active note to move down with speed
+        for k in range(count):
+          note = slots[(head + k) % self.LANE_CAPACITY]
+          if note.active:
+            if note.holding:
+              if not self.hold_held(note):
+                self.place_hold(note)
+              continue
+            # calculate new position and render it
+            note.y += step
+            note.tile.y = note.y // self.SUBPIXEL
+            if note.hold:
+              self.place_hold(note)
+
+            # check if the note has gone past the hit line (missed)
+            if note.y > bottom:
+              self.missed(lane, note)
+              missed += 1
+      # drop finished notes from the head of the lane
+      while count and not slots[head].active:
+        head = (head + 1) % self.LANE_CAPACITY
+        count -= 1
+      self.lane_head[lane] = head
+      self.lane_count[lane] = count
     return missed
   
-  def note_hit(self, lane, is_flick=False):
-    # update the global score variable
-    for note in self.notes:
-        # if the note is in the correct lane
-        if note["lane"] == lane:
-            # check if the note is within the hit window
-            note_center = note["y"] + self.NOTE_H / 2
-            
-            # Flick notes get 1.5x larger hit window
-            hit_window = self.NOTE_H / 2
-            if note["type"] == "flick":
-                hit_window *= 1.5
-            
-            if self.HIT_Y - hit_window <= note_center <= self.HIT_Y + hit_window:
-                # Check if input type matches note type
-                if (note["type"] == "flick" and is_flick) or (note["type"] == "tap" and not is_flick):
-                    # if it hit we remove the note from the screen and active notes
-                    self.note_group.remove(note["sprite"])
-                    self.notes.remove(note)
-                    return True
-    return False
+  def judge(self, clicked, flicked, chords=True):
+    """Judge every input of a tick in one sweep over the lane heads: the
+    buttons in clicked and a flick. Each lane is scanned once for both.
+    Results go to tap_results (HIT, HOLD or 0) and flick_results. A button
+    judges the oldest note of its lane in the window; a flick judges the
+    oldest flick note of every lane with chords, otherwise of the first one.
+    Returns how many notes the flick hit."""
+    center = self.HIT_Y * self.SUBPIXEL
+    half = self.NOTE_H * self.SUBPIXEL // 2
+    # Flick notes get 1.5x larger hit window
+    flick_window = half * 3 // 2
+    flick_hits = 0
+    for lane in range(self.LANES):
+      self.tap_results[lane] = 0
+      self.flick_results[lane] = False
+      tap = clicked[lane]
+      flick = flicked and (chords or not flick_hits)
+      if not (tap or flick):
+        continue
+      slots = self.lanes[lane]
+      head = self.lane_head[lane]
+      # the oldest note in the lane (lowest on screen) comes first
+      for k in range(self.lane_count[lane]):
+        note = slots[(head + k) % self.LANE_CAPACITY]
+        if not note.active or note.holding:
+          continue
+        note_center = note.y + half
+        if note_center < center - (flick_window if flick else half):
+          # every note behind this one is even higher up
+          break
+        if note.flick:
+          if flick and note_center <= center + flick_window:
+            self.hit(lane, note, note_center - center)
+            self.flick_results[lane] = True
+            flick_hits += 1
+            flick = False
+        elif tap and center - half <= note_center <= center + half:
+          self.tap_results[lane] = self.hit(lane, note, note_center - center)
+          tap = False
+        if not (tap or flick):
+          break
+    return flick_hits
+
+  def hit(self, lane, note, offset):
+    """A note was hit offset subpixels off the hit line, returns HIT or HOLD"""
+    if self.telemetry is not None:
+      self.telemetry.judge(telemetry.HIT, lane, offset, note.beat)
+    if note.hold:
+      # the head stays on screen until the hold is let go
+      note.holding = True
+      self.holding[lane] = note
+      return self.HOLD
+    # if it hit we hide the note, the slot is freed once it reaches the head
+    self.remove_note(note)
+    return self.HIT
+
+  def release_hold(self, lane):
+    """Let go of the hold held in lane. Returns True if its tail had reached
+    the hit window, False if it was let go too early."""
+    note = self.holding[lane]
+    on_time = note.length <= self.NOTE_H * self.SUBPIXEL // 2
+    if self.telemetry is not None:
+      # how early it was let go
+      self.telemetry.judge(telemetry.HOLD_END if on_time else telemetry.MISS, lane, note.length, note.beat)
+    self.remove_note(note)
+    return on_time
   
   # update score and misses UI
   def update_ui(self, score, miss, level=1):
-    self.score_label.text = "Score: {}".format(score)
-    self.miss_label.text = "Miss: {}".format(miss)
-    self.level_label.text = "Level: {}".format(level)
+    self.score_counter.set(score)
+    self.miss_counter.set(miss)
+    self.level_counter.set(level)
   
   def set_difficulty(self, difficulty_index):
-    """Set note height based on difficulty: 0=Easy(10px), 1=Medium(8px), 2=Hard(6px), 3=Custom(6px)"""
-    if difficulty_index == 0:  # Easy
-      self.NOTE_H = 12
-    elif difficulty_index == 1:  # Medium
-      self.NOTE_H = 9
-    elif difficulty_index == 2:  # Hard
-      self.NOTE_H = 6
-    else:  # Custom
-      self.NOTE_H = 6
+    """Set note height based on difficulty: 0=Easy(12px), 1=Medium(9px), 2=Hard(6px), 3=Custom(6px)"""
+    note_h = self.NOTE_HEIGHTS[min(difficulty_index, len(self.NOTE_HEIGHTS) - 1)]
+    if note_h != self.NOTE_H:
+      self.NOTE_H = note_h
+      self.build_note_pool()
     print(f"Difficulty set to {self.difficulty_names[difficulty_index]}, Note height: {self.NOTE_H}px")
 
   def clear(self):
@@ -240,11 +708,29 @@ class Visuals:
       self.rendering = "menu"
       self.clear()
       self.text_group.hidden = False
-    
+      self.menu_index = None
+
+    # the text only changes when the selection moves
+    if difficulty_index == self.menu_index:
+      return
+    self.menu_index = difficulty_index
     text = self.MENU_LINES.copy()
     text[difficulty_index + 1] = "> " + text[(difficulty_index % self.MAX_LINES) + 1] + " <"
     self.update_text(text, difficulty_index + 1)
 
+  def show_song_select(self, song, index, count, difficulty_name, message=None):
+    """song None if it couldn't be read, message replaces the help line"""
+    if (self.rendering != "song select"):
+      self.rendering = "song select"
+      self.clear()
+      self.text_group.hidden = False
+    if song is None:
+      title, tempo = "?", difficulty_name
+    else:
+      title, tempo = song.title[:21], f"{song.bpm:g} BPM {difficulty_name}"
+    text = ["SELECT SONG", f"< {index + 1}/{count} >", title, tempo, "1-3 play 4 back" if message is None else message[:21]]
+    self.update_text(text)
+
   def show_game(self):
     if (self.rendering != "game"):
       self.rendering = "game"
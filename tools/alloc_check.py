@@ -0,0 +1,200 @@
+"""Check that gameplay allocates nothing on the heap.
+
+  micropython tools/alloc_check.py   # MicroPython/CircuitPython unix port
+  python tools/alloc_check.py        # CPython
+
+Plays a dense chart with the autoplay bot on the simulator, with both note
+renderers, and measures every GameManager.update() of the playing state:
+bus sampling, the button pins through check_clicks, input and frame ticks,
+display refreshes, the overload governor, telemetry, the LEDs and the power
+governor. The bot presses the fake button pins, so update() runs exactly
+like the main loop in code.py. Every tick must allocate exactly nothing.
+
+On MicroPython the heap is measured with gc.mem_alloc() around each tick
+with the collector disabled, which is exactly what the board sees. On
+CPython tracemalloc runs over the measured part of the song and its peak is
+reset before every tick, so a tick also shows blocks it freed again, like a
+temporary f-string or list. A tick allocates when its peak is over
+CPYTHON_SLACK: what CPython allocates for two nested range loops and two
+boxed numbers, which MicroPython all runs without allocating. After the
+measured ticks, any block src/ made during them and still holds fails the
+check too (boxed floats and ints below 2**30 aside, MicroPython doesn't box
+those). The chart has NOTES notes, so beat indices and the score stay in
+CPython's cache of small ints. Allocations smaller than the slack can still
+hide on CPython, the MicroPython run is the exact one.
+Exits with 1 if any tick allocated.
+"""
+import gc
+import sys
+
+TOOLS = __file__.rsplit("/", 1)[0] if "/" in __file__ else "."
+ROOT = TOOLS.rsplit("/", 1)[0] if "/" in TOOLS else ".."
+sys.path.insert(0, TOOLS + "/sim/fakes")
+sys.path.insert(0, ROOT + "/src")
+
+from GameManager import GameManager  # noqa: E402
+import stress  # noqa: E402
+
+if hasattr(gc, "mem_alloc"):
+  CPYTHON = False
+
+  def start_measuring():
+    pass
+
+  def tick_start():
+    return gc.mem_alloc()
+
+  def tick_allocated(start):
+    """Bytes allocated since tick_start()"""
+    return gc.mem_alloc() - start
+
+  def stop_measuring():
+    """(bytes, where) still held from the measured ticks, the ticks count
+    them already here"""
+    return 0, None
+else:
+  import os
+  import tracemalloc
+
+  CPYTHON = True
+  SRC = [tracemalloc.Filter(True, os.path.abspath(ROOT + "/src") + os.sep + "*")]
+
+  def box_sizes():
+    """Block sizes of a boxed float and int, values MicroPython keeps in the
+    object pointer itself"""
+    tracemalloc.start()
+    # more floats than CPython keeps around for reuse; the lists are bigger
+    values = [i + 0.5 for i in range(200)] + [(1 << 29) + i for i in range(200)]  # noqa: F841
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return {trace.size for trace in snapshot.traces if trace.size < 64}
+
+  def loop_peak():
+    """What a range loop allocates: the range and its iterator"""
+    tracemalloc.start()
+    for i in range(2):
+      pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+  BOXES = box_sizes()
+  CPYTHON_SLACK = 2 * loop_peak() + 2 * max(BOXES)
+  overhead = 0
+
+  def start_measuring():
+    global overhead
+    tracemalloc.start()
+    # what measuring an empty tick costs by itself
+    start = tick_start()
+    overhead = tracemalloc.get_traced_memory()[1] - start
+
+  def tick_start():
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+  def tick_allocated(start):
+    """Bytes over the slack at the tick's peak since tick_start()"""
+    used = tracemalloc.get_traced_memory()[1] - start - overhead
+    return used if used > CPYTHON_SLACK else 0
+
+  def stop_measuring():
+    """(bytes, where) of the blocks src/ made during the measured ticks and
+    still holds, boxed numbers aside"""
+    snapshot = tracemalloc.take_snapshot().filter_traces(SRC)
+    tracemalloc.stop()
+    kept = 0
+    where = None
+    for trace in snapshot.traces:
+      if trace.size not in BOXES:
+        kept += trace.size
+        frame = trace.traceback[0]
+        where = f"{os.path.basename(frame.filename)}:{frame.lineno}"
+    return kept, where
+
+NOTES = 256  # CPython caches the ints up to 256
+WARMUP = 3.0  # seconds of song before measuring, lets lists reach their final size
+STEP = 0.001  # seconds between updates, about one pass of the main loop
+# notes played unmeasured at the end: the tick that judges the last ones ends
+# the song and draws the result screen, which may allocate
+TAIL = 8
+
+
+def play(game, chart, virtual, measure):
+  """Play the chart once. Returns (ticks measured, ticks that allocated,
+  worst bytes, bytes still held after them, where)."""
+  game.assign_beat_map(chart)
+  game.start_game(track=1)
+  bot = stress.AutoPlayer(game)
+  buttons = game.buttons
+  clicked = [False] * len(buttons)
+  released = [False] * len(buttons)
+
+  ticks = 0
+  allocating = 0
+  worst = 0
+  kept = 0
+  where = None
+  measuring = False
+  gc.collect()
+  gc.disable()
+  while game.state == "playing":
+    virtual[0] += STEP
+    now = virtual[0]
+    song_now = now - game.song_start
+    if now - game.last_input_update >= game.input_interval:
+      # update() reads the buttons now: press the pins the bot wants down
+      for i in range(len(clicked)):
+        clicked[i] = False
+      if bot.inputs(song_now, clicked, released):
+        game.accelerometer.flicked = True
+      for i in range(len(buttons)):
+        buttons[i].value = not (clicked[i] or bot.release_at[i] >= 0)  # active low
+
+    if measure and not measuring and song_now > WARMUP:
+      start_measuring()
+      measuring = True
+    elif measuring and game.completed_beats >= len(chart) - TAIL:
+      kept, where = stop_measuring()
+      measuring = measure = False
+    if not measuring:
+      game.update()
+      continue
+    before = tick_start()
+    game.update()
+    used = tick_allocated(before)
+    ticks += 1
+    if used:
+      allocating += 1
+      worst = max(worst, used)
+  if measuring:
+    kept, where = stop_measuring()
+  gc.enable()
+  return ticks, allocating, worst, kept, where
+
+
+def main():
+  chart = list(stress.SyntheticChart("mixed", notes=NOTES, nps=8))
+  failed = False
+  for renderer in ("sprites", "bitmap"):
+    game = GameManager()
+    game.visual.set_renderer(renderer)
+    game.difficulty = 2
+    game.max_misses = len(chart)
+    virtual = [0.0]
+    game.clock = lambda: virtual[0]
+    game.governor.sleep = lambda seconds: None
+
+    if CPYTHON:
+      # CPython specializes bytecode (and allocates) the first times a path runs
+      play(game, chart, virtual, measure=False)
+    ticks, allocating, worst, kept, where = play(game, chart, virtual, measure=True)
+    print(f"{renderer}: {ticks} updates measured, {allocating} allocated"
+          + (f" (worst {worst} bytes)" if allocating else "")
+          + (f", {kept} bytes still held, the last at {where}" if kept else ""))
+    failed = failed or allocating > 0 or kept > 0
+  return 1 if failed else 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,313 @@
+"""Host benchmarks of the hot paths, compared against a saved baseline.
+
+  python tools/bench.py --save                 # record tools/bench_baseline.json
+  python tools/bench.py                        # compare, exit 1 on a regression
+  python tools/bench.py --sizes 100 100000 --tolerance 0.4
+
+Runs on the simulator fakes (tools/sim/fakes). The chart paths
+(Visuals.spawn_note_in_lane, update_notes, judge and
+GameManager.update_game_display) are timed while the autoplay bot plays a
+window of WINDOW notes at the end of a synthetic "mixed" chart of each size,
+so a cost that grows with the chart shows up between sizes. The other paths
+don't depend on the chart and are timed once. Every result is the best of
+--repeat runs, in microseconds per call.
+
+The baseline in tools/bench_baseline.json is checked in and
+tools/test_bench.py compares against it under pytest; a missing baseline
+fails the comparison. Timings are only comparable on the same machine and
+Python (the baseline records both), so on another host save one before a
+change and compare after it. A path regresses when it is more than
+--tolerance slower than its baseline and also at least MIN_DELTA_US slower
+(sub-microsecond calls are mostly noise). On a busy or virtual machine
+raise --repeat, the best run is the one that counts.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import sim
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+SIZES = (100, 1000, 10000, 100000)
+WINDOW = 768  # notes played per chart size, four cycles of the mixed pattern
+NPS = 8
+CALLS = 2000  # calls per run of the paths that don't depend on the chart
+MIN_DELTA_US = 0.5
+ANY_SIZE = "-"
+
+CHART_PATHS = (
+  "Visuals.spawn_note_in_lane",
+  "Visuals.update_notes",
+  "Visuals.judge",
+  "GameManager.update_game_display",
+  "GameManager.calculate_level_distribution",
+)
+
+
+class Timed:
+  """Wraps a bound method and adds up the time spent in it"""
+
+  def __init__(self, method):
+    self.method = method
+    self.calls = 0
+    self.ns = 0
+
+  def __call__(self, *args, **kwargs):
+    start = time.perf_counter_ns()
+    result = self.method(*args, **kwargs)
+    self.ns += time.perf_counter_ns() - start
+    self.calls += 1
+    return result
+
+
+class FifoDevice:
+  """ADXL345 stand-in with SAMPLES queued in its FIFO on every read, a
+  slow wave with a sharp upward spike now and then so flicks do fire.
+  (The simulator's fake I2CDevice always reports an empty FIFO.)"""
+
+  SAMPLES = 4  # about what piles up between two input ticks
+  FIFO_STATUS = 0x39
+  WAVE = (256, 260, 262, 258, 254, 250, 252, 256, 256, 256, 256, 600)
+
+  def __init__(self):
+    self.sample = 0
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc, traceback):
+    return False
+
+  def write(self, buf, start=0, end=None):
+    pass
+
+  def write_then_readinto(self, out_buffer, in_buffer, out_start=0, out_end=None, in_start=0, in_end=None):
+    if out_buffer[0] == self.FIFO_STATUS:
+      in_buffer[0] = self.SAMPLES
+      return
+    z = self.WAVE[self.sample % len(self.WAVE)]
+    self.sample += 1
+    in_buffer[4] = z & 0xFF
+    in_buffer[5] = (z >> 8) & 0xFF
+
+
+def best(runs, measure):
+  """Lowest time per call over several runs of measure() -> (ns, calls)"""
+  result = None
+  for _ in range(runs):
+    gc.collect()
+    gc.disable()
+    try:
+      ns, calls = measure()
+    finally:
+      gc.enable()
+    if calls:
+      us = ns / calls / 1000
+      result = us if result is None else min(result, us)
+  return result
+
+
+def play_window(game, chart, virtual, timers):
+  """Seek to the last WINDOW notes of the chart and play them with the bot.
+
+  timers maps names of Visuals methods to Timed wrappers installed for the
+  run; with none the frames themselves are timed. Returns (ns, frames).
+  """
+  import stress
+
+  first = max(0, len(chart) - WINDOW)
+  game.start_game(track=1)
+  # pick the song up a moment before the first note of the window spawns
+  game.song_start = virtual[0] - (chart[first][0] - game.FALL_TIME - 0.1)
+  game.beat_index = first
+  game.completed_beats = first
+  while game.current_level < game.max_level and first >= game.level_start_indices[game.current_level]:
+    game.current_level += 1
+  bot = stress.AutoPlayer(game)
+  bot.next_note = first
+  # stop once the last note has spawned, before the song ends
+  end = chart[len(chart) - 1][0] - game.FALL_TIME
+  clicked = [False] * len(game.buttons)
+
+  for name, timer in timers.items():
+    setattr(game.visual, name, timer)
+  frame_ns = 0
+  frames = 0
+  next_input = next_frame = virtual[0]
+  try:
+    while game.state == "playing":
+      now = min(next_input, next_frame)
+      virtual[0] = now
+      song_now = now - game.song_start
+      if song_now > end:
+        break
+      if now == next_input:
+        for i in range(len(clicked)):
+          clicked[i] = False
+        if bot.inputs(song_now, clicked, game.released):
+          game.accelerometer.flicked = True
+        game.input_tick(now, clicked)
+        next_input += game.input_interval
+      if now == next_frame and game.state == "playing":
+        start = time.perf_counter_ns()
+        game.frame_tick(now)
+        frame_ns += time.perf_counter_ns() - start
+        frames += 1
+        next_frame += game.visual_interval
+  finally:
+    for name in timers:
+      delattr(game.visual, name)
+  return frame_ns, frames
+
+
+def bench_chart(size, runs):
+  """Times of the chart paths while playing a chart of size notes"""
+  import stress
+
+  chart = stress.SyntheticChart("mixed", size, NPS)
+  game = sim.new_game(chart)
+  game.difficulty = 2
+  game.max_misses = size
+  virtual = [0.0]
+  game.clock = lambda: virtual[0]
+
+  results = {"GameManager.update_game_display": best(runs, lambda: play_window(game, chart, virtual, {}))}
+  for path in CHART_PATHS[:3]:
+    name = path.split(".")[1]
+
+    def measure():
+      timer = Timed(getattr(game.visual, name))
+      play_window(game, chart, virtual, {name: timer})
+      return timer.ns, timer.calls
+    results[path] = best(runs, measure)
+
+  def distribution():
+    start = time.perf_counter_ns()
+    for _ in range(CALLS):
+      game.calculate_level_distribution()
+    return time.perf_counter_ns() - start, CALLS
+  results["GameManager.calculate_level_distribution"] = best(runs, distribution)
+  return results
+
+
+def bench_other(runs):
+  """Times of the paths that don't depend on the chart"""
+  import busio
+  from accelerometer import Accelerometer
+  from audio import AudioPlayer
+  from high_score import HighScoreManager
+
+  audio = AudioPlayer()
+
+  def send():
+    start = time.perf_counter_ns()
+    for i in range(CALLS):
+      audio._send(0x03, i & 0xFF)
+    return time.perf_counter_ns() - start, CALLS
+
+  accelerometer = Accelerometer(busio.I2C(None, None))
+  accelerometer.device = FifoDevice()
+
+  def detect():
+    start = time.perf_counter_ns()
+    for _ in range(CALLS):
+      accelerometer.detect_flick()
+    return time.perf_counter_ns() - start, CALLS
+
+  results = {
+    "AudioPlayer._send": best(runs, send),
+    "Accelerometer.detect_flick": best(runs, detect),
+  }
+  with tempfile.TemporaryDirectory() as folder:
+    scores = HighScoreManager(os.path.join(folder, "high_scores.json"))
+    calls = CALLS // 10  # every call rewrites the file
+
+    def add():
+      start = time.perf_counter_ns()
+      for i in range(calls):
+        scores.add_score("BEN", i, i % 7)
+      return time.perf_counter_ns() - start, calls
+    results["HighScoreManager.add_score"] = best(runs, add)
+  return results
+
+
+def run(sizes, runs):
+  """{path: {size: microseconds per call}}, sizes as strings like in the JSON"""
+  sim.install()  # src/stress.py, not tools/stress.py
+  results = {}
+  # the game prints its log and game over lines, keep the report readable
+  with contextlib.redirect_stdout(io.StringIO()):
+    for size in sizes:
+      for path, us in bench_chart(size, runs).items():
+        results.setdefault(path, {})[str(size)] = us
+    for path, us in bench_other(runs).items():
+      results[path] = {ANY_SIZE: us}
+  return results
+
+
+def compare(results, baseline, tolerance):
+  """Print every result against its baseline, returns the regressions"""
+  regressions = []
+  print(f"{'path':42} {'notes':>6} {'us/call':>9} {'baseline':>9} {'change':>7}")
+  for path, by_size in results.items():
+    for size, us in by_size.items():
+      base = baseline.get(path, {}).get(size)
+      if base is None:
+        print(f"{path:42} {size:>6} {us:9.2f} {'-':>9}")
+        continue
+      change = us / base - 1
+      regressed = change > tolerance and us - base >= MIN_DELTA_US
+      flag = "  REGRESSION" if regressed else ""
+      print(f"{path:42} {size:>6} {us:9.2f} {base:9.2f} {change:+7.0%}{flag}")
+      if regressed:
+        regressions.append((path, size))
+  return regressions
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="chart sizes in notes")
+  parser.add_argument("--repeat", type=int, default=5, help="runs per path, the best one counts")
+  parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline")
+  parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file")
+  parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+  args = parser.parse_args()
+
+  host = {"python": platform.python_version(), "machine": platform.machine()}
+  results = run(args.sizes, args.repeat)
+
+  if args.save:
+    rounded = {path: {size: round(us, 3) for size, us in by_size.items()} for path, by_size in results.items()}
+    with open(args.baseline, "w") as f:
+      json.dump({"host": host, "results": rounded}, f, indent=2, sort_keys=True)
+      f.write("\n")
+    compare(results, {}, args.tolerance)
+    print(f"\nbaseline saved to {args.baseline}")
+    return 0
+
+  try:
+    with open(args.baseline) as f:
+      saved = json.load(f)
+  except OSError:
+    compare(results, {}, args.tolerance)
+    print(f"\nno baseline at {args.baseline}, record one with --save")
+    return 1
+  if saved.get("host") != host:
+    print(f"warning: baseline from {saved.get('host')}, this is {host}")
+  regressions = compare(results, saved["results"], args.tolerance)
+  if regressions:
+    print(f"\n{len(regressions)} path(s) more than {args.tolerance:.0%} slower than the baseline")
+    return 1
+  print(f"\nno regressions beyond {args.tolerance:.0%}")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
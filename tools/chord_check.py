@@ -0,0 +1,87 @@
+"""Check that chords are judged in one pass per input tick.
+
+  python tools/chord_check.py
+
+The autoplay bot plays the "chords" pattern (four buttons at once) and the
+"multi" pattern (four buttons, a flick across four lanes, two buttons with
+a flick across the other two) with both note renderers. With the chord rule
+(GameManager.CHORDS) every note must be hit. Without it a flick scores one
+lane, so every other flick note of a flick chord must be missed. Every tick
+with input must sweep the lanes exactly once (Visuals.judge). Exits with 1
+when any of that fails.
+"""
+import contextlib
+import io
+import sys
+
+import sim
+
+NOTES = 960
+NPS = 8
+
+
+class Counted:
+  """Wraps Visuals.judge and counts the calls"""
+
+  def __init__(self, method):
+    self.method = method
+    self.calls = 0
+
+  def __call__(self, *args):
+    self.calls += 1
+    return self.method(*args)
+
+
+def check(pattern, renderer, chords):
+  """Play the pattern, returns a list of what went wrong"""
+  import stress
+
+  chart = stress.SyntheticChart(pattern, NOTES, NPS)
+  game = sim.new_game(chart)
+  game.chords = chords
+  judge = Counted(game.visual.judge)
+  game.visual.judge = judge
+  ticks = [0]
+  input_tick = game.input_tick
+
+  def counting_input_tick(now, clicked):
+    if True in clicked or game.accelerometer.flicked:
+      ticks[0] += 1
+    input_tick(now, clicked)
+  game.input_tick = counting_input_tick
+
+  # the game prints its log and result at the end of the song
+  with contextlib.redirect_stdout(io.StringIO()):
+    result = stress.run(game, chart, max_misses=NOTES, renderer=renderer)
+
+  # a flick chord without the rule scores its first lane only
+  expected = 0
+  if not chords:
+    for i in range(0, NOTES, 4):
+      flicks = sum(1 for k in range(i, min(i + 4, NOTES)) if chart[k][2] == "flick")
+      expected += max(0, flicks - 1)
+  problems = []
+  if result["misses"] != expected or result["score"] != NOTES - expected:
+    problems.append(f"score {result['score']}, misses {result['misses']}, expected {expected} misses")
+  if judge.calls != ticks[0]:
+    problems.append(f"{judge.calls} sweeps for {ticks[0]} ticks with input")
+  print(f"{pattern:6} {renderer:7} chords {'on ' if chords else 'off'}: score {result['score']}, "
+        f"misses {result['misses']}, {judge.calls} sweeps{'  FAIL' if problems else ''}")
+  return problems
+
+
+def main():
+  sim.install()  # src/stress.py, not tools/stress.py
+  failed = 0
+  for pattern in ("chords", "multi"):
+    for renderer in ("sprites", "bitmap"):
+      for chords in (True, False):
+        problems = check(pattern, renderer, chords)
+        for problem in problems:
+          print("  " + problem)
+        failed += bool(problems)
+  return 1 if failed else 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
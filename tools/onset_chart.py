@@ -0,0 +1,231 @@
+"""Generate a beat map from a WAV file with spectral-flux onset detection.
+
+  python tools/onset_chart.py song.wav -o songs/song.chart
+  python tools/onset_chart.py song.wav --lanes pitch --flick-percentile 95 --format py
+
+Everything is vectorized with NumPy: the STFT is one rfft over a strided view
+of the signal, so a whole song takes a fraction of a second. The output is a
+chart file (src/chart.py) for songs/ or a Python list literal.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+import sim
+
+sim.install()
+import chart  # noqa: E402
+from GameManager import GameManager  # noqa: E402
+from visual import Visuals  # noqa: E402
+
+# a note earlier than its fall time lands late (tools/validate_charts.py),
+# rounded up to the millisecond like the note times
+FALL_TIME = math.ceil(Visuals.HIT_Y / (Visuals.SPEED * GameManager.FPS) * 1000) / 1000
+
+LANES = 4
+
+
+def load_wav(filename, target_rate=11025):
+  """Mono float32 samples in [-1, 1] at about target_rate Hz, the rate and the duration.
+
+  Channels are mixed and the rate reduced in a single averaging pass over
+  blocks of interleaved samples; onsets show up fine below 5 kHz.
+  """
+  with wave.open(filename, "rb") as w:
+    rate = w.getframerate()
+    channels = w.getnchannels()
+    width = w.getsampwidth()
+    raw = w.readframes(w.getnframes())
+  if width == 1:
+    ints, scale, bias = np.frombuffer(raw, dtype=np.uint8), 1 / 128, -1.0
+  elif width == 2:
+    ints, scale, bias = np.frombuffer(raw, dtype="<i2"), 1 / 32768, 0.0
+  elif width == 3:
+    b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+    ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+    ints, scale, bias = np.where(ints & 0x800000, ints - 0x1000000, ints), 1 / 8388608, 0.0
+  elif width == 4:
+    ints, scale, bias = np.frombuffer(raw, dtype="<i4"), 1 / 2147483648, 0.0
+  else:
+    raise ValueError(f"unsupported sample width: {width}")
+
+  factor = max(1, rate // target_rate)
+  block = factor * channels
+  usable = len(ints) - len(ints) % block
+  sums = ints[:usable].reshape(-1, block).sum(axis=1, dtype=np.int64)
+  samples = (sums * (scale / block) + bias).astype(np.float32)
+  return samples, rate / factor, len(ints) / channels / rate
+
+
+def spectrogram(samples, rate, frame=512, hop=128):
+  """Log-magnitude STFT (frames x bins) and the frame times"""
+  if len(samples) < frame:
+    samples = np.pad(samples, (0, frame - len(samples)))
+  frames = np.lib.stride_tricks.sliding_window_view(samples, frame)[::hop]
+  spectrum = np.abs(np.fft.rfft(frames * np.hanning(frame).astype(np.float32), axis=1))
+  times = (np.arange(len(frames)) * hop + frame / 2) / rate
+  return np.log1p(100 * spectrum), times
+
+
+def spectral_flux(spec):
+  """Sum of positive magnitude changes per frame, normalized to 0-1"""
+  flux = np.maximum(np.diff(spec, axis=0), 0).sum(axis=1)
+  flux = np.concatenate(([0.0], flux))
+  peak = flux.max()
+  return flux / peak if peak > 0 else flux
+
+
+def pick_onsets(flux, frame_rate, window=0.1, delta=0.05, min_gap=0.1):
+  """Frames that are a local maximum and stand out from a moving average"""
+  w = max(1, int(window * frame_rate))
+  kernel = np.ones(2 * w + 1) / (2 * w + 1)
+  threshold = np.convolve(flux, kernel, mode="same") + delta
+
+  padded = np.pad(flux, w, mode="constant", constant_values=-np.inf)
+  local_max = flux >= np.lib.stride_tricks.sliding_window_view(padded, 2 * w + 1).max(axis=1)
+  candidates = np.flatnonzero(local_max & (flux > threshold))
+
+  # keep the first onset in every min_gap window
+  keep = []
+  last = -np.inf
+  gap = min_gap * frame_rate
+  for index in candidates:
+    if index - last >= gap:
+      keep.append(index)
+      last = index
+  return np.array(keep, dtype=int)
+
+
+def estimate_tempo(flux, frame_rate, low=60, high=200):
+  """BPM with the strongest autocorrelation of the onset envelope"""
+  env = flux - flux.mean()
+  n = len(env)
+  size = 1 << (2 * n - 1).bit_length()
+  spectrum = np.fft.rfft(env, size)
+  autocorr = np.fft.irfft(spectrum * np.conj(spectrum), size)[:n]
+  lags = np.arange(int(frame_rate * 60 / high), int(frame_rate * 60 / low) + 1)
+  lags = lags[(lags > 0) & (lags < n)]
+  if len(lags) == 0:
+    return 0.0
+  best = lags[np.argmax(autocorr[lags])]
+  return 60 * frame_rate / best
+
+
+def snap(times, bpm, subdivision, offset):
+  """Move onset times onto the nearest 1/subdivision beat"""
+  step = 60 / bpm / subdivision
+  return np.round((times - offset) / step) * step + offset
+
+
+def assign_lanes(spec, onset_frames, rule, seed=0):
+  """Lane (1-4) for every onset.
+
+  cycle: 1 2 3 4 1 2 ...
+  pitch: spectral centroid quartiles, low sounds left, high sounds right
+  random: uniform, seeded, never the same lane twice in a row
+  """
+  count = len(onset_frames)
+  if rule == "cycle":
+    return np.arange(count) % LANES + 1
+  if rule == "pitch":
+    rows = spec[onset_frames]
+    bins = np.arange(spec.shape[1])
+    centroid = (rows * bins).sum(axis=1) / np.maximum(rows.sum(axis=1), 1e-9)
+    edges = np.quantile(centroid, [0.25, 0.5, 0.75]) if count else []
+    return np.searchsorted(edges, centroid) + 1
+  if rule == "random":
+    rng = np.random.default_rng(seed)
+    steps = rng.integers(1, LANES, size=count)
+    return (np.cumsum(steps) % LANES) + 1
+  raise ValueError("unknown lane rule: " + rule)
+
+
+def assign_types(strength, times, percentile, cooldown):
+  """The strongest onsets become flicks, at most one per flick cooldown"""
+  types = np.full(len(times), "tap", dtype=object)
+  if len(times) == 0 or percentile >= 100:
+    return types
+  limit = np.percentile(strength, percentile)
+  last = -np.inf
+  for i in np.flatnonzero(strength >= limit):
+    if times[i] - last >= cooldown:
+      types[i] = "flick"
+      last = times[i]
+  return types
+
+
+def generate(filename, args):
+  samples, rate, duration = load_wav(filename, args.rate)
+  spec, frame_times = spectrogram(samples, rate, args.frame, args.hop)
+  frame_rate = rate / args.hop
+  flux = spectral_flux(spec)
+
+  onset_frames = pick_onsets(flux, frame_rate, args.window, args.delta, args.min_gap)
+  bpm = args.bpm or estimate_tempo(flux, frame_rate)
+  times = frame_times[onset_frames] + args.offset
+  if args.snap and bpm > 0 and len(times):
+    times = snap(times, bpm, args.snap, times[0])
+    times, unique = np.unique(np.round(times, 3), return_index=True)
+    onset_frames = onset_frames[unique]
+
+  keep = np.round(times, 3) >= args.start
+  times = times[keep]
+  onset_frames = onset_frames[keep]
+
+  lanes = assign_lanes(spec, onset_frames, args.lanes, args.seed)
+  types = assign_types(flux[onset_frames], times, args.flick_percentile, args.flick_cooldown)
+  notes = [(round(float(t), 3), int(lane), str(kind)) for t, lane, kind in zip(times, lanes, types)]
+  return notes, bpm, duration
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("wav")
+  parser.add_argument("-o", "--output", help="chart file to write (default: print)")
+  parser.add_argument("--format", choices=("chart", "py"), default="chart")
+  parser.add_argument("--rate", type=int, default=11025, help="analysis sample rate (Hz)")
+  parser.add_argument("--frame", type=int, default=512, help="STFT frame size in samples")
+  parser.add_argument("--hop", type=int, default=128, help="STFT hop size in samples")
+  parser.add_argument("--window", type=float, default=0.1, help="peak picking window (s)")
+  parser.add_argument("--delta", type=float, default=0.05, help="how far above the local mean an onset must be")
+  parser.add_argument("--min-gap", type=float, default=0.15, help="minimum time between notes (s)")
+  parser.add_argument("--bpm", type=float, default=0, help="skip tempo estimation")
+  parser.add_argument("--snap", type=int, default=0, help="snap to 1/N beats, 0 = off")
+  parser.add_argument("--offset", type=float, default=0, help="shift every note (s)")
+  parser.add_argument("--start", type=float, default=FALL_TIME,
+                      help=f"drop notes before this time (s), default the fall time {FALL_TIME} s: earlier ones land late")
+  parser.add_argument("--lanes", choices=("cycle", "pitch", "random"), default="pitch")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--flick-percentile", type=float, default=95, help="onsets this strong become flicks, 100 = none")
+  parser.add_argument("--flick-cooldown", type=float, default=0.4, help="matches Accelerometer.cooldown")
+  args = parser.parse_args()
+
+  start = time.perf_counter()
+  notes, bpm, duration = generate(args.wav, args)
+  elapsed = time.perf_counter() - start
+
+  if args.format == "py":
+    text = "beat_map = [\n" + ",\n".join(f'    ({t:.3f}, {lane}, "{kind}")' for t, lane, kind in notes) + "\n]\n"
+  else:
+    text = "".join(chart.format_note(note) for note in notes)
+
+  if args.output:
+    if args.format == "py":
+      with open(args.output, "w") as f:
+        f.write(text)
+    else:
+      chart.save_chart(args.output, notes, f"{os.path.basename(args.wav)}, {bpm:.1f} BPM, {len(notes)} notes")
+  else:
+    sys.stdout.write(text)
+
+  flicks = sum(1 for note in notes if note[2] == "flick")
+  print(f"{len(notes)} notes ({flicks} flicks), {bpm:.1f} BPM, {duration:.1f} s of audio in {elapsed * 1000:.0f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+  main()
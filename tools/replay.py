@@ -0,0 +1,50 @@
+"""Replay an input log recorded on the device against the simulator.
+
+  python tools/replay.py input_log.bin
+  python tools/replay.py input_log.bin --difficulty 2 --repeat 20 --profile
+"""
+import argparse
+import cProfile
+import pstats
+import time
+
+import sim
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("log", help="input log written by InputRecorder")
+  parser.add_argument("--speed", type=float, default=0, help="1 = real time, 0 = as fast as possible")
+  parser.add_argument("--repeat", type=int, default=1, help="replay the log this many times")
+  parser.add_argument("--profile", action="store_true", help="print the hottest functions")
+  args = parser.parse_args()
+
+  sim.install()
+  from input_log import InputReplay
+
+  profiler = cProfile.Profile() if args.profile else None
+  results = []
+  start = time.perf_counter()
+  for _ in range(args.repeat):
+    game = sim.new_game()
+    if profiler:
+      profiler.enable()
+    results.append(InputReplay(args.log).run(game, speed=args.speed))
+    if profiler:
+      profiler.disable()
+  elapsed = time.perf_counter() - start
+
+  first = results[0]
+  print(f"score {first['score']}  misses {first['misses']}  level {first['level']}  state {first['state']}")
+  print(f"{first['frames']} frames, {first['inputs']} input ticks, {args.repeat} run(s) in {elapsed:.2f} s")
+  for result in results[1:]:
+    if (result["score"], result["misses"], result["level"]) != (first["score"], first["misses"], first["level"]):
+      print("replay is not deterministic:", result)
+      return 1
+  if profiler:
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,49 @@
+"""Host-side simulator for the rhythm game.
+
+install() puts fake CircuitPython modules (tools/sim/fakes) and the game
+sources (src/) on sys.path so GameManager runs unmodified under CPython.
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SRC = os.path.join(ROOT, "src")
+CATALOG = os.path.join(ROOT, "songs", "index.txt")
+FAKES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fakes")
+
+
+def install():
+  for path in (SRC, FAKES):
+    if path not in sys.path:
+      sys.path.insert(0, path)
+
+
+def default_beat_map():
+  """The Easy chart of the first song in songs/index.txt"""
+  install()
+  from song_catalog import SongCatalog
+
+  return SongCatalog(CATALOG).load_chart(0, 0)
+
+
+def new_game(beat_map=None):
+  """Build a GameManager on the fake hardware (skipping the boot delay)
+
+  Without a beat_map the game gets the song catalog of the repository, like
+  the board. With one the catalog is empty, so the menu starts that chart.
+  """
+  install()
+  from GameManager import GameManager
+  from song_catalog import SongCatalog
+
+  sleep = time.sleep
+  time.sleep = lambda seconds: None
+  try:
+    game = GameManager()
+  finally:
+    time.sleep = sleep
+  game.governor.sleep = lambda seconds: None  # callers drive the clock
+  game.catalog = SongCatalog(CATALOG if beat_map is None else None)
+  game.assign_beat_map(default_beat_map() if beat_map is None else beat_map)
+  return game
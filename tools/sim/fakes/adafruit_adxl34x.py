@@ -0,0 +1,14 @@
+"""Fake ADXL345 lying flat and still"""
+
+
+class Range:
+  RANGE_2_G = 0
+  RANGE_4_G = 1
+  RANGE_8_G = 2
+  RANGE_16_G = 3
+
+
+class ADXL345:
+  def __init__(self, i2c, address=0x53):
+    self.range = Range.RANGE_2_G
+    self.acceleration = (0.0, 0.0, 9.80665)
@@ -0,0 +1,20 @@
+"""Fake label.Label, lays text out on a fixed 6x12 grid"""
+
+
+class Label:
+  def __init__(self, font, text="", x=0, y=0, color=0xFFFFFF, **kwargs):
+    self.font = font
+    self.x = x
+    self.y = y
+    self.color = color
+    self.hidden = False
+    self.text = text
+
+  @property
+  def text(self):
+    return self._text
+
+  @text.setter
+  def text(self, value):
+    self._text = value
+    self.bounding_box = (0, 0, 6 * len(value), 12 if value else 0)
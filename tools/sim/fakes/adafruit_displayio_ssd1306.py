@@ -0,0 +1,14 @@
+"""Fake SSD1306 display, refresh() only counts frames"""
+
+
+class SSD1306:
+  def __init__(self, bus, width=128, height=64, **kwargs):
+    self.width = width
+    self.height = height
+    self.root_group = None
+    self.auto_refresh = True
+    self.refreshes = 0
+
+  def refresh(self, target_frames_per_second=None, minimum_frames_per_second=0):
+    self.refreshes += 1
+    return True
@@ -0,0 +1,38 @@
+"""Fake bitmaptools with the two calls the bitmap renderer uses.
+
+Written with while loops over the flat buffer: a range loop or a tuple key
+per pixel allocates on CPython, and tools/alloc_check.py would count that
+against the game."""
+
+
+def fill_region(dest_bitmap, x1, y1, x2, y2, value):
+  data = dest_bitmap._data
+  width = dest_bitmap.width
+  y = y1
+  while y < y2:
+    i = y * width + x1
+    end = y * width + x2
+    while i < end:
+      data[i] = value
+      i += 1
+    y += 1
+
+
+def blit(dest_bitmap, source_bitmap, x, y, *, x1=0, y1=0, x2=None, y2=None,
+         skip_source_index=None, skip_dest_index=None):
+  x2 = source_bitmap.width if x2 is None else x2
+  y2 = source_bitmap.height if y2 is None else y2
+  source = source_bitmap._data
+  dest = dest_bitmap._data
+  row = y1
+  while row < y2:
+    i = row * source_bitmap.width + x1
+    end = row * source_bitmap.width + x2
+    j = (y + row - y1) * dest_bitmap.width + x
+    while i < end:
+      value = source[i]
+      if value != skip_source_index:
+        dest[j] = value
+      i += 1
+      j += 1
+    row += 1
@@ -0,0 +1,22 @@
+"""Fake digitalio: inputs idle high (pull-up), the simulator sets value"""
+
+
+class Direction:
+  INPUT = "input"
+  OUTPUT = "output"
+
+
+class Pull:
+  UP = "up"
+  DOWN = "down"
+
+
+class DigitalInOut:
+  def __init__(self, pin):
+    self.pin = pin
+    self.direction = Direction.INPUT
+    self.pull = None
+    self.value = True
+
+  def deinit(self):
+    pass
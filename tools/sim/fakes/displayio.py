@@ -0,0 +1,106 @@
+"""Fake displayio with just enough behaviour for Visuals"""
+
+
+def release_displays():
+  pass
+
+
+class Bitmap:
+  def __init__(self, width, height, value_count):
+    self.width = width
+    self.height = height
+    self._data = bytearray(width * height)
+
+  def _index(self, key):
+    if isinstance(key, tuple):
+      return key[1] * self.width + key[0]
+    return key
+
+  def __setitem__(self, key, value):
+    self._data[self._index(key)] = value
+
+  def __getitem__(self, key):
+    return self._data[self._index(key)]
+
+  def fill(self, value):
+    self._data[:] = bytes([value]) * len(self._data)
+
+
+class Palette:
+  def __init__(self, color_count):
+    self._colors = [0] * color_count
+
+  def __setitem__(self, index, color):
+    self._colors[index] = color
+
+  def __getitem__(self, index):
+    return self._colors[index]
+
+  def __len__(self):
+    return len(self._colors)
+
+  def make_transparent(self, index):
+    pass
+
+
+class TileGrid:
+  def __init__(self, bitmap, pixel_shader=None, x=0, y=0, width=1, height=1,
+               tile_width=None, tile_height=None, default_tile=0):
+    self.bitmap = bitmap
+    self.pixel_shader = pixel_shader
+    self.x = x
+    self.y = y
+    self.width = width
+    self.height = height
+    self.tile_width = tile_width or bitmap.width
+    self.tile_height = tile_height or bitmap.height
+    self.hidden = False
+    self._tiles = [default_tile] * (width * height)
+
+  def _index(self, key):
+    if isinstance(key, tuple):
+      return key[1] * self.width + key[0]
+    return key
+
+  def __setitem__(self, key, tile):
+    self._tiles[self._index(key)] = tile
+
+  def __getitem__(self, key):
+    return self._tiles[self._index(key)]
+
+
+class Group:
+  def __init__(self, scale=1, x=0, y=0):
+    self.scale = scale
+    self.x = x
+    self.y = y
+    self.hidden = False
+    self._children = []
+
+  def append(self, layer):
+    self._children.append(layer)
+
+  def insert(self, index, layer):
+    self._children.insert(index, layer)
+
+  def remove(self, layer):
+    self._children.remove(layer)
+
+  def pop(self, index=-1):
+    return self._children.pop(index)
+
+  def index(self, layer):
+    return self._children.index(layer)
+
+  def __len__(self):
+    return len(self._children)
+
+  def __iter__(self):
+    # iterate over a snapshot like displayio does, so removing while iterating is safe
+    return iter(list(self._children))
+
+  def __getitem__(self, index):
+    return self._children[index]
+
+  def __contains__(self, layer):
+    return layer in self._children
@@ -0,0 +1,7 @@
+"""Fake i2cdisplaybus"""
+
+
+class I2CDisplayBus:
+  def __init__(self, i2c, device_address=0x3C):
+    self.i2c = i2c
+    self.device_address = device_address
@@ -0,0 +1,32 @@
+"""Fake NeoPixel strip, show() only counts writes"""
+
+
+class NeoPixel:
+  def __init__(self, pin, n, brightness=1.0, auto_write=True, **kwargs):
+    self.n = n
+    self.brightness = brightness
+    self.auto_write = auto_write
+    self._pixels = [(0, 0, 0)] * n
+    self.shows = 0
+
+  def __len__(self):
+    return self.n
+
+  def __setitem__(self, index, color):
+    self._pixels[index] = color
+    if self.auto_write:
+      self.show()
+
+  def __getitem__(self, index):
+    return self._pixels[index]
+
+  def fill(self, color):
+    i = 0
+    while i < self.n:  # a range loop would allocate (tools/alloc_check.py)
+      self._pixels[i] = color
+      i += 1
+    if self.auto_write:
+      self.show()
+
+  def show(self):
+    self.shows += 1
@@ -0,0 +1,10 @@
+"""Fake rotaryio, the simulator moves position directly"""
+
+
+class IncrementalEncoder:
+  def __init__(self, pin_a, pin_b, divisor=4):
+    self.divisor = divisor
+    self.position = 0
+
+  def deinit(self):
+    pass
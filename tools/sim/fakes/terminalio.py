@@ -0,0 +1,26 @@
+"""Fake terminalio: a 6x12 fixed width font over printable ASCII"""
+import displayio
+
+
+class _Glyph:
+  def __init__(self, tile_index):
+    self.tile_index = tile_index
+    self.width = 6
+    self.height = 12
+
+
+class _Font:
+  def __init__(self):
+    # one 6x12 tile per character from " " to "~", like the built-in font sheet
+    self.bitmap = displayio.Bitmap(6 * 95, 12, 2)
+
+  def get_bounding_box(self):
+    return (6, 12)
+
+  def get_glyph(self, codepoint):
+    if not 32 <= codepoint < 127:
+      return None
+    return _Glyph(codepoint - 32)
+
+
+FONT = _Font()
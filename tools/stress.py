@@ -0,0 +1,38 @@
+"""Headless stress run: synthetic dense charts played by the autoplay bot.
+
+  python tools/stress.py --pattern mixed --notes 10000 --nps 12
+  python tools/stress.py --pattern chords --nps 4 8 16 32
+  python tools/stress.py --nps 16 --renderer sprites bitmap
+
+Timings come from the host simulator, so they show relative cost and scaling;
+run src/stress.py on the board (STRESS_TEST in code.py) for device numbers.
+The bitmap renderer draws through a pure Python bitmaptools fake here, so
+only the board can compare the two renderers fairly.
+"""
+import argparse
+
+import sim
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--pattern", default="mixed", help="stream, chords, flicks, mixed, holds or multi")
+  parser.add_argument("--notes", type=int, default=10000)
+  parser.add_argument("--nps", type=float, nargs="+", default=[8], help="notes per second, several values make a sweep")
+  parser.add_argument("--difficulty", type=int, default=2, help="0=Easy 1=Medium 2=Hard")
+  parser.add_argument("--renderer", nargs="+", default=["sprites"], help="sprites and/or bitmap")
+  args = parser.parse_args()
+
+  sim.install()
+  import stress
+
+  for renderer in args.renderer:
+    for nps in args.nps:
+      game = sim.new_game()
+      chart = stress.SyntheticChart(args.pattern, args.notes, nps)
+      print(f"--- {args.pattern}, {nps:g} notes/s, {renderer} ---")
+      stress.print_report(stress.run(game, chart, args.difficulty, max_misses=args.notes, renderer=renderer))
+
+
+if __name__ == "__main__":
+  main()
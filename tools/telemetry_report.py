@@ -0,0 +1,275 @@
+"""Analyze session telemetry logs written by src/telemetry.py.
+
+  python tools/telemetry_report.py telemetry.bin
+  python tools/telemetry_report.py logs/*.bin --plots report/ --tolerance 0.05
+
+Every song session in every log is loaded into NumPy arrays. The report
+shows timing drift (hit offsets over the song and from session to session),
+miss hotspots by beat index per chart, flick peaks, GC events, and frame-time
+percentiles per firmware build (the BUILD label in telemetry.py), in the
+order the builds first appear, with how many frames overran the budget.
+The percentiles come from the regular FRAME samples only. A build whose p95 frame time is more than
+--tolerance above the previous build's is flagged as a regression, and the
+exit status is then 1. --plots also saves the figures as PNGs (needs
+matplotlib).
+"""
+import argparse
+import os
+import struct
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+import telemetry  # noqa: E402
+
+RECORD_DTYPE = np.dtype([("t", "<u4"), ("kind", "u1"), ("lane", "u1"), ("value", "<i2"), ("beat", "<u2")])
+assert RECORD_DTYPE.itemsize == telemetry.RECORD_SIZE
+
+
+def load(path):
+  """The sessions in one log, as dicts with the records in a structured array"""
+  with open(path, "rb") as f:
+    data = f.read()
+  sessions = []
+  offset = 0
+  while offset + telemetry.HEADER_SIZE <= len(data):
+    magic, version, build, major, minor, micro, track, difficulty, count, dropped = struct.unpack_from(
+      telemetry.HEADER_FORMAT, data, offset)
+    if magic != telemetry.MAGIC or version != telemetry.VERSION:
+      raise ValueError(f"{path}: no session header at byte {offset}")
+    offset += telemetry.HEADER_SIZE
+    records = np.frombuffer(data, RECORD_DTYPE, count, offset)
+    offset += count * telemetry.RECORD_SIZE
+    sessions.append({
+      "source": path,
+      "build": build.rstrip(b"\0").decode(),
+      "circuitpython": f"{major}.{minor}.{micro}",
+      "track": track,
+      "difficulty": difficulty,
+      "dropped": dropped,
+      "records": records,
+    })
+  return sessions
+
+
+def kind(session, kind):
+  records = session["records"]
+  return records[records["kind"] == kind]
+
+
+def timing_drift(sessions):
+  """Per session: hits, mean and median offset (ms), and the drift of the
+  offset over the song (ms per minute, least squares)"""
+  rows = []
+  for s in sessions:
+    hits = kind(s, telemetry.HIT)
+    row = {"hits": len(hits), "mean_ms": np.nan, "median_ms": np.nan, "drift_ms_per_min": np.nan}
+    if len(hits):
+      offsets = hits["value"] / 10
+      row["mean_ms"] = offsets.mean()
+      row["median_ms"] = np.median(offsets)
+      if len(hits) > 2:
+        minutes = hits["t"] / 60e6
+        row["drift_ms_per_min"] = np.polyfit(minutes, offsets, 1)[0]
+    rows.append(row)
+  return rows
+
+
+def miss_hotspots(sessions, top=10):
+  """Per chart (track, difficulty): sessions, misses per beat index summed over
+  the sessions, and the beats missed most often"""
+  charts = {}
+  for s in sessions:
+    key = (s["track"], s["difficulty"])
+    misses = kind(s, telemetry.MISS)["beat"]
+    counts = np.bincount(misses, minlength=1)
+    entry = charts.setdefault(key, {"sessions": 0, "per_beat": np.zeros(1, dtype=np.int64)})
+    entry["sessions"] += 1
+    if len(counts) > len(entry["per_beat"]):
+      entry["per_beat"] = np.pad(entry["per_beat"], (0, len(counts) - len(entry["per_beat"])))
+    entry["per_beat"][:len(counts)] += counts
+  for entry in charts.values():
+    per_beat = entry["per_beat"]
+    hot = np.argsort(per_beat, kind="stable")[::-1][:top]
+    entry["hotspots"] = [(int(beat), int(per_beat[beat])) for beat in hot if per_beat[beat]]
+  return charts
+
+
+def frame_times(sessions):
+  """Frame-time samples (ms) per build, builds in order of first appearance"""
+  builds = {}
+  for s in sessions:
+    samples = kind(s, telemetry.FRAME)["value"] / 10
+    builds.setdefault(s["build"], []).append(samples)
+  return {build: np.concatenate(parts) for build, parts in builds.items()}
+
+
+def frame_overruns(sessions):
+  """Per build: frames over the budget, all frames (FRAME samples times
+  Telemetry.FRAME_EVERY), the share that overran and the longest (ms)"""
+  builds = {}
+  for s in sessions:
+    entry = builds.setdefault(s["build"], {"overruns": 0, "frames": 0, "max": 0.0})
+    overruns = kind(s, telemetry.OVERRUN)["value"] / 10
+    entry["overruns"] += len(overruns)
+    if len(overruns):
+      entry["max"] = max(entry["max"], overruns.max())
+    entry["frames"] += len(kind(s, telemetry.FRAME)) * telemetry.Telemetry.FRAME_EVERY
+  for entry in builds.values():
+    entry["rate"] = entry["overruns"] / entry["frames"] if entry["frames"] else np.nan
+  return builds
+
+
+def frame_regressions(builds, tolerance):
+  """Percentiles per build and whether its p95 regressed against the build before"""
+  rows = []
+  previous = None
+  for build, samples in builds.items():
+    row = {"build": build, "samples": len(samples)}
+    if len(samples):
+      row.update(zip(("p50", "p95", "p99"), np.percentile(samples, (50, 95, 99))))
+      row["max"] = samples.max()
+    row["regression"] = bool(previous is not None and len(samples) and previous.get("p95")
+                             and row["p95"] > previous["p95"] * (1 + tolerance))
+    rows.append(row)
+    if len(samples):
+      previous = row
+  return rows
+
+
+def flick_peaks(sessions):
+  """High-pass peaks (m/s^2) of flicks that hit a note and of flicks that didn't"""
+  flicks = np.concatenate([kind(s, telemetry.FLICK) for s in sessions]) if sessions else np.zeros(0, RECORD_DTYPE)
+  peaks = flicks["value"] / 100
+  hit = flicks["lane"] != telemetry.NO_LANE
+  return peaks[hit], peaks[~hit]
+
+
+def gc_events(sessions):
+  """Durations (ms) of the collections at safe points and of those by the allocator"""
+  events = np.concatenate([kind(s, telemetry.GC) for s in sessions]) if sessions else np.zeros(0, RECORD_DTYPE)
+  planned = events[events["lane"] == 0]["value"] / 10
+  automatic = events[events["lane"] == 1]["value"] / 10
+  return planned, automatic
+
+
+def degradations(sessions):
+  """Per build: overload level changes, how many were escalations, the highest level"""
+  builds = {}
+  for s in sessions:
+    events = kind(s, telemetry.DEGRADE)
+    entry = builds.setdefault(s["build"], {"changes": 0, "escalations": 0, "max_level": 0})
+    entry["changes"] += len(events)
+    if len(events):
+      # levels only move one step, up from 0 at the start of a song
+      steps = np.diff(np.concatenate(([0], events["lane"].astype(int))))
+      entry["escalations"] += int((steps > 0).sum())
+      entry["max_level"] = max(entry["max_level"], int(events["lane"].max()))
+  return builds
+
+
+def percentiles(values):
+  if not len(values):
+    return "-"
+  p50, p95 = np.percentile(values, (50, 95))
+  return f"p50 {p50:.2f} p95 {p95:.2f}"
+
+
+def plot(sessions, drift, charts, builds, folder):
+  import matplotlib
+  matplotlib.use("Agg")
+  import matplotlib.pyplot as plt
+
+  os.makedirs(folder, exist_ok=True)
+
+  fig, (over_song, over_sessions) = plt.subplots(2, 1, figsize=(10, 7))
+  for s in sessions:
+    hits = kind(s, telemetry.HIT)
+    over_song.plot(hits["t"] / 1e6, hits["value"] / 10, ".", markersize=2, alpha=0.4)
+  over_song.axhline(0, color="k", linewidth=0.5)
+  over_song.set(xlabel="song time (s)", ylabel="hit offset (ms, + late)", title="Timing drift within songs")
+  means = [row["mean_ms"] for row in drift]
+  over_sessions.plot(means, "o-")
+  over_sessions.axhline(0, color="k", linewidth=0.5)
+  over_sessions.set(xlabel="session", ylabel="mean offset (ms)", title="Timing drift between sessions")
+  fig.tight_layout()
+  fig.savefig(os.path.join(folder, "drift.png"))
+
+  fig, axes = plt.subplots(len(charts), 1, figsize=(10, 2.5 * len(charts)), squeeze=False)
+  for ax, ((track, difficulty), entry) in zip(axes[:, 0], sorted(charts.items())):
+    ax.bar(np.arange(len(entry["per_beat"])), entry["per_beat"], width=1.0)
+    ax.set(xlabel="beat index", ylabel="misses", title=f"Track {track}, difficulty {difficulty} ({entry['sessions']} sessions)")
+  fig.tight_layout()
+  fig.savefig(os.path.join(folder, "misses.png"))
+
+  fig, ax = plt.subplots(figsize=(10, 4))
+  names = [build for build, samples in builds.items() if len(samples)]
+  if names:
+    ax.boxplot([builds[build] for build in names], showfliers=False)
+    ax.set_xticks(range(1, len(names) + 1), names)
+  ax.set(xlabel="build", ylabel="frame time (ms)", title="Frame times per build")
+  fig.tight_layout()
+  fig.savefig(os.path.join(folder, "frames.png"))
+  plt.close("all")
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("logs", nargs="+", help="telemetry.bin files copied off the board")
+  parser.add_argument("--tolerance", type=float, default=0.1, help="allowed p95 frame-time growth between builds")
+  parser.add_argument("--plots", help="save drift.png, misses.png and frames.png in this folder")
+  args = parser.parse_args()
+
+  sessions = []
+  for path in args.logs:
+    sessions.extend(load(path))
+  if not sessions:
+    print("no sessions")
+    return 1
+
+  drift = timing_drift(sessions)
+  print(f"{len(sessions)} sessions from {len(args.logs)} log(s)")
+  print(f"{'session':>7} {'build':16} {'track':>5} {'diff':>4} {'hits':>5} {'mean ms':>8} {'median':>7} {'drift/min':>9} {'dropped':>7}")
+  for i, (s, row) in enumerate(zip(sessions, drift)):
+    print(f"{i:7d} {s['build']:16} {s['track']:5d} {s['difficulty']:4d} {row['hits']:5d} {row['mean_ms']:8.1f} "
+          f"{row['median_ms']:7.1f} {row['drift_ms_per_min']:9.2f} {s['dropped']:7d}")
+
+  charts = miss_hotspots(sessions)
+  print("\nMiss hotspots (beat index: misses)")
+  for (track, difficulty), entry in sorted(charts.items()):
+    spots = ", ".join(f"{beat}: {n}" for beat, n in entry["hotspots"]) or "none"
+    print(f"  track {track} difficulty {difficulty}, {entry['sessions']} sessions: {spots}")
+
+  hit_peaks, empty_peaks = flick_peaks(sessions)
+  print(f"\nFlick peaks m/s^2: {len(hit_peaks)} on a note ({percentiles(hit_peaks)}), {len(empty_peaks)} on nothing ({percentiles(empty_peaks)})")
+  planned, automatic = gc_events(sessions)
+  print(f"GC: {len(planned)} at safe points ({percentiles(planned)} ms), {len(automatic)} by the allocator")
+
+  builds = frame_times(sessions)
+  regressions = frame_regressions(builds, args.tolerance)
+  overruns = frame_overruns(sessions)
+  print(f"\n{'build':16} {'samples':>7} {'p50':>6} {'p95':>6} {'p99':>6} {'max':>6} {'overruns':>8} {'rate':>6}")
+  for row in regressions:
+    over = overruns[row["build"]]
+    over_text = f"{over['overruns']:8d} {over['rate']:6.1%}"
+    if row["samples"]:
+      flag = "  REGRESSION" if row["regression"] else ""
+      longest = max(row["max"], over["max"])  # overruns aren't samples but the longest frames
+      print(f"{row['build']:16} {row['samples']:7d} {row['p50']:6.1f} {row['p95']:6.1f} {row['p99']:6.1f} {longest:6.1f} "
+            f"{over_text}{flag}")
+    else:
+      print(f"{row['build']:16} {0:7d} {'':27} {over_text}")
+
+  print("\nOverload (src/overload.py levels: 1 no HUD, 2 no LEDs, 3 half frames)")
+  for build, entry in degradations(sessions).items():
+    print(f"{build:16} {entry['escalations']:4d} escalations, {entry['changes']:4d} level changes, up to level {entry['max_level']}")
+
+  if args.plots:
+    plot(sessions, drift, charts, builds, args.plots)
+    print(f"\nplots saved in {args.plots}")
+  return 1 if any(row["regression"] for row in regressions) else 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
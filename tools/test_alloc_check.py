@@ -0,0 +1,27 @@
+"""tools/alloc_check.py on the clean tree and with an allocation put back.
+
+  pytest tools/test_alloc_check.py
+
+(Not python -m pytest from the top folder: its code.py would shadow the
+standard library module of that name.)
+"""
+import alloc_check
+from GameManager import GameManager
+
+
+def test_gameplay_allocates_nothing():
+  assert alloc_check.main() == 0
+
+
+def test_allocation_per_frame_fails(monkeypatch):
+  update_game_display = GameManager.update_game_display
+
+  def allocating(self, *args):
+    # a temporary string and list every frame, both freed again
+    label = f"Score: {self.score}"
+    parts = [label, self.combo]  # noqa: F841
+    return update_game_display(self, *args)
+
+  # the playing state binds the method when the GameManager is made
+  monkeypatch.setattr(GameManager, "update_game_display", allocating)
+  assert alloc_check.main() == 1
@@ -0,0 +1,63 @@
+"""The hot paths against the checked in baseline (tools/bench_baseline.json).
+
+  pytest tools/test_bench.py
+
+(Not python -m pytest from the top folder: its code.py would shadow the
+standard library module of that name.)
+
+The baseline was recorded on one host, so the comparison allows TOLERANCE
+instead of bench.py's default: enough for another machine's noise, not for
+a path that starts to scale with the chart. Record a new baseline with
+python tools/bench.py --save when a change is meant to be slower, or on a
+much slower host.
+"""
+import json
+import os
+import sys
+
+import bench
+
+TOLERANCE = 1.0  # twice the baseline
+REPEAT = 5
+
+
+def load_baseline():
+  with open(bench.BASELINE) as f:
+    return json.load(f)
+
+
+def test_baseline_covers_every_path():
+  results = load_baseline()["results"]
+  for path in bench.CHART_PATHS:
+    assert sorted(results[path]) == sorted(str(size) for size in bench.SIZES), path
+  for path in ("AudioPlayer._send", "Accelerometer.detect_flick", "HighScoreManager.add_score"):
+    assert list(results[path]) == [bench.ANY_SIZE], path
+
+
+def test_no_regression_against_baseline():
+  results = bench.run(bench.SIZES, REPEAT)
+  regressions = bench.compare(results, load_baseline()["results"], TOLERANCE)
+  assert regressions == []
+
+
+def test_compare_flags_slower_paths():
+  baseline = {"a": {"100": 10.0}, "b": {"100": 10.0}, "c": {"100": 0.2}}
+  results = {"a": {"100": 30.0}, "b": {"100": 11.0}, "c": {"100": 0.6}, "d": {"100": 5.0}}
+  # c is three times slower but by less than MIN_DELTA_US, d has no baseline
+  assert bench.compare(results, baseline, 0.25) == [("a", "100")]
+
+
+def test_missing_baseline_fails(tmp_path, monkeypatch):
+  monkeypatch.setattr(bench, "run", lambda sizes, runs: {"a": {"100": 1.0}})
+  missing = os.path.join(str(tmp_path), "none.json")
+  monkeypatch.setattr(sys, "argv", ["bench.py", "--baseline", missing])
+  assert bench.main() == 1
+
+
+def test_save_then_compare(tmp_path, monkeypatch):
+  monkeypatch.setattr(bench, "run", lambda sizes, runs: {"a": {"100": 1.0}})
+  saved = os.path.join(str(tmp_path), "baseline.json")
+  monkeypatch.setattr(sys, "argv", ["bench.py", "--baseline", saved, "--save"])
+  assert bench.main() == 0
+  monkeypatch.setattr(sys, "argv", ["bench.py", "--baseline", saved])
+  assert bench.main() == 0
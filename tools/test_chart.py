@@ -0,0 +1,31 @@
+"""Chart line parsing (src/chart.py).
+
+  pytest tools/test_chart.py
+
+(Not python -m pytest from the top folder: its code.py would shadow the
+standard library module of that name.)
+"""
+import pytest
+
+import sim
+
+sim.install()
+import chart  # noqa: E402
+
+
+def test_lanes_in_range():
+  assert chart.parse_line("3.0,1,tap") == (3.0, 1, "tap")
+  assert chart.parse_line("3.0,4,hold,0.5") == (3.0, 4, "hold", 0.5)
+
+
+@pytest.mark.parametrize("lane", [0, 5])
+def test_lane_out_of_range(lane):
+  with pytest.raises(ValueError):
+    chart.parse_line(f"3.0,{lane},tap")
+
+
+def test_check_chart_rejects_lane(tmp_path):
+  path = tmp_path / "bad.chart"
+  path.write_text("2.0,1,tap\n3.0,5,flick\n")
+  with pytest.raises(ValueError):
+    chart.check_chart(str(path))
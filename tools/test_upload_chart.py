@@ -0,0 +1,107 @@
+"""tools/upload_chart.py against the board side (src/chart_upload.py), over
+a loopback serial line.
+
+  pytest tools/test_upload_chart.py
+
+(Not python -m pytest from the top folder: its code.py would shadow the
+standard library module of that name.)
+"""
+import os
+
+import pytest
+
+import upload_chart
+import chart_upload
+
+
+class Governor:
+  def wake(self, now):
+    pass
+
+
+class Game:
+  def __init__(self):
+    self.governor = Governor()
+    self.beat_map = []
+    self.upload_track = None
+
+  def assign_beat_map(self, beat_map):
+    self.beat_map = beat_map
+
+
+class Link:
+  """The board's end of the serial line"""
+
+  def __init__(self):
+    self.to_board = bytearray()
+    self.to_host = []
+
+  def read(self):
+    data = bytes(self.to_board)
+    self.to_board = bytearray()
+    return data
+
+  def write(self, data):
+    self.to_host.append(data)
+
+
+class Port:
+  """The host's end: every readline() lets the board poll what was written"""
+
+  def __init__(self, link, board):
+    self.link = link
+    self.board = board
+
+  def write(self, data):
+    self.link.to_board.extend(data)
+
+  def readline(self):
+    self.board.poll(0.0)
+    return self.link.to_host.pop(0) if self.link.to_host else b""
+
+
+def upload(tmp_path, text, **options):
+  """(game, stats) of sending text as test.chart to a board saving to tmp_path"""
+  link = Link()
+  game = Game()
+  board = chart_upload.ChartUpload(link, str(tmp_path) + os.sep)
+  board.start(game)
+  stats = upload_chart.send(Port(link, board), text.encode(), "test.chart", 1, timeout=0.2, **options)
+  return game, stats
+
+
+def test_upload_loads_the_chart(tmp_path):
+  game, stats = upload(tmp_path, "2.0,1,tap\n2.5,4,hold,0.5\n")
+  assert stats["notes"] == 2
+  assert stats["encoding"] == "zlib"
+  assert game.beat_map == [(2.0, 1, "tap"), (2.5, 4, "hold", 0.5)]
+  assert os.listdir(str(tmp_path)) == ["test.chart"]
+
+
+def test_lane_out_of_range_is_refused(tmp_path):
+  with pytest.raises(upload_chart.UploadError, match="lane out of range"):
+    upload(tmp_path, "2.0,1,tap\n2.5,5,tap\n")
+  assert os.listdir(str(tmp_path)) == []
+
+
+def test_failed_rename_is_refused(tmp_path, monkeypatch):
+  def rename(source, target):
+    raise OSError(28)  # ENOSPC
+
+  monkeypatch.setattr(chart_upload.os, "rename", rename)
+  with pytest.raises(upload_chart.UploadError, match="can't save test.chart"):
+    upload(tmp_path, "2.0,1,tap\n")
+  assert os.listdir(str(tmp_path)) == []
+
+
+def test_raw_upload(tmp_path):
+  game, stats = upload(tmp_path, "2.0,1,tap\n", compress=False)
+  assert stats["encoding"] == "raw"
+  assert game.beat_map == [(2.0, 1, "tap")]
+
+
+def test_board_without_zlib_gets_raw_chunks(tmp_path, monkeypatch):
+  monkeypatch.setattr(chart_upload, "zlib", None)
+  game, stats = upload(tmp_path, "2.0,1,tap\n")
+  assert stats["encoding"] == "raw"
+  assert game.beat_map == [(2.0, 1, "tap")]
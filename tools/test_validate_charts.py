@@ -0,0 +1,17 @@
+"""The playability rules of tools/validate_charts.py.
+
+  pytest tools/test_validate_charts.py
+
+(Not python -m pytest from the top folder: its code.py would shadow the
+standard library module of that name.)
+"""
+import validate_charts
+
+
+def test_order_checked_on_notes_with_bad_fields():
+  notes = [(13.0, 1, "tap"), (12.0, 5, "tap"), (11.5, 2, "spin"), (11.0, 3, "tap", 0.5)]
+  errors, warnings = validate_charts.check(notes)
+  order = [i for i, message in errors if "before previous note" in message]
+  fields = [i for i, message in errors if "before previous note" not in message]
+  assert order == [1, 2, 3]
+  assert fields == [1, 2, 3]
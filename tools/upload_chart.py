@@ -0,0 +1,189 @@
+"""Send a chart to the board over USB serial while its menu is showing.
+
+  python tools/upload_chart.py songs/demo.chart --port /dev/ttyACM0
+  python tools/upload_chart.py my.chart --port COM5 --name demo.chart --track 1
+
+Needs pyserial and CHART_UPLOAD = True in code.py (src/chart_upload.py is
+the board side and documents the protocol). The port is the console, or the
+second CDC port if boot.py enables usb_cdc.data. The chart is checked here
+first, then sent in CHUNK byte chunks that are zlib compressed one by one
+(the board can only decompress; raw with --raw or if the board has no
+zlib), base64 encoded and checksummed, WINDOW chunks ahead of the
+acknowledgements. The board writes them straight to
+flash and loads the chart once it is complete: the menu buttons then play
+it (the last one still opens the song list). --name saves it under another
+name in songs/, the name of a catalog chart replaces that chart.
+
+The end-to-end throughput is reported: chart bytes per second from BEGIN to
+the board's DONE, which includes the flash writes and loading the chart.
+"""
+import argparse
+import binascii
+import os
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+import chart  # noqa: E402
+import chart_upload  # noqa: E402
+
+TAG = chart_upload.TAG.decode()
+RETRIES = 5  # timeouts and NAKs allowed per chunk
+
+
+class UploadError(Exception):
+  pass
+
+
+def encode_chunks(data, size, compress):
+  """The DATA lines for the chart, one per chunk"""
+  lines = []
+  for seq, start in enumerate(range(0, len(data), size)):
+    chunk = data[start:start + size]
+    if compress:
+      chunk = zlib.compress(chunk, 9)
+    payload = binascii.b2a_base64(chunk, newline=False).decode()
+    lines.append(f"{TAG} DATA {seq} {binascii.crc32(chunk):08x} {payload}\n".encode())
+  return lines
+
+
+def wait(port, expected, timeout, echo):
+  """The fields of the next protocol reply in expected, None on a timeout.
+  Other lines are the game's own output."""
+  deadline = time.monotonic() + timeout
+  while time.monotonic() < deadline:
+    line = port.readline()
+    if not line:
+      continue
+    text = line.decode(errors="replace").strip()
+    fields = text.split(" ")
+    if fields[0] == TAG and len(fields) > 1:
+      if fields[1] == "ERR":
+        raise UploadError("board: " + " ".join(fields[2:]))
+      if fields[1] in expected:
+        return fields[1:]
+    elif echo and text:
+      print("board>", text)
+  return None
+
+
+def retry(retries, seq, reason):
+  retries[seq] += 1
+  if retries[seq] > RETRIES:
+    raise UploadError(f"chunk {seq} failed {RETRIES + 1} times ({reason})")
+
+
+def begin(port, data, name, track, encoding, timeout, echo):
+  """The board's chunk size for the upload. Raises UploadError."""
+  port.write(f"{TAG} BEGIN {name} {track} {len(data)} {binascii.crc32(data):08x} {encoding}\n".encode())
+  reply = wait(port, ("READY",), timeout, echo)
+  if reply is None:
+    raise UploadError("no answer, is the game on its menu with CHART_UPLOAD set?")
+  return int(reply[2])
+
+
+def send(port, data, name, track, compress=True, chunk=chart_upload.CHUNK, window=chart_upload.WINDOW,
+         timeout=5.0, echo=False):
+  """Upload a chart, returns transfer statistics. Raises UploadError."""
+  start = time.monotonic()
+  encoding = "zlib" if compress else "raw"
+  try:
+    board_chunk = begin(port, data, name, track, encoding, timeout, echo)
+  except UploadError as error:
+    if encoding != "zlib" or str(error) != "board: no zlib":
+      raise
+    encoding = "raw"
+    board_chunk = begin(port, data, name, track, encoding, timeout, echo)
+  lines = encode_chunks(data, min(chunk, board_chunk), encoding == "zlib")
+
+  wire = 0
+  resent = 0
+  acked = 0  # chunks the board has written
+  sent = 0
+  retries = [0] * len(lines)
+  while acked < len(lines):
+    while sent < len(lines) and sent < acked + window:
+      port.write(lines[sent])
+      wire += len(lines[sent])
+      sent += 1
+    reply = wait(port, ("ACK", "NAK"), timeout, echo)
+    if reply is None:
+      # lost, go back to the first chunk without an ACK
+      retry(retries, acked, "no answer")
+      resent += sent - acked
+      sent = acked
+    elif reply[0] == "ACK":
+      acked = max(acked, int(reply[1]) + 1)
+    else:
+      seq = int(reply[1])
+      reason = " ".join(reply[2:])
+      if echo:
+        print(f"chunk {seq} rejected: {reason}")
+      retry(retries, seq, reason)
+      resent += sent - seq
+      sent = acked = seq
+
+  port.write(f"{TAG} END\n".encode())
+  reply = wait(port, ("DONE",), timeout * 4, echo)
+  if reply is None:
+    raise UploadError("no answer after the last chunk")
+  elapsed = time.monotonic() - start
+  return {
+    "bytes": len(data),
+    "wire_bytes": wire,
+    "chunks": len(lines),
+    "resent": resent,
+    "encoding": encoding,
+    "notes": int(reply[1]),
+    "seconds": elapsed,
+  }
+
+
+def print_report(name, stats):
+  seconds = max(stats["seconds"], 1e-9)
+  print(f"{name}: {stats['notes']} notes, {stats['bytes']} bytes in {stats['chunks']} chunks ({stats['encoding']}), "
+        f"{stats['wire_bytes']} bytes sent ({stats['wire_bytes'] / max(stats['bytes'], 1):.0%}), {stats['resent']} chunks resent")
+  print(f"{seconds:.2f} s: {stats['bytes'] / seconds / 1024:.1f} KiB/s of chart, "
+        f"{stats['wire_bytes'] / seconds / 1024:.1f} KiB/s on the wire")
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("chart", help="chart file to send")
+  parser.add_argument("--port", required=True, help="serial port of the board")
+  parser.add_argument("--baud", type=int, default=115200, help="ignored by native USB ports")
+  parser.add_argument("--name", help="file name on the board (default: the chart's own)")
+  parser.add_argument("--track", type=int, default=1, help="DFPlayer track to play it with")
+  parser.add_argument("--chunk", type=int, default=chart_upload.CHUNK, help="bytes per chunk")
+  parser.add_argument("--window", type=int, default=chart_upload.WINDOW, help="chunks sent ahead of the ACKs")
+  parser.add_argument("--raw", action="store_true", help="don't compress")
+  parser.add_argument("--verbose", action="store_true", help="show what the game prints")
+  args = parser.parse_args()
+
+  try:
+    notes = len(chart.load_chart(args.chart))
+  except ValueError as error:
+    print(f"{args.chart}: {error}")
+    return 1
+  with open(args.chart, "rb") as f:
+    data = f.read()
+  name = args.name or os.path.basename(args.chart)
+
+  import serial
+
+  with serial.Serial(args.port, args.baud, timeout=0.1) as port:
+    try:
+      stats = send(port, data, name, args.track, not args.raw, args.chunk, args.window, echo=args.verbose)
+    except UploadError as error:
+      port.write(f"{TAG} ABORT\n".encode())
+      print(error)
+      return 1
+  if stats["notes"] != notes:
+    print(f"warning: the board loaded {stats['notes']} notes, the chart has {notes}")
+  print_report(name, stats)
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,212 @@
+"""Validate and rate every chart in a directory, one process per chart.
+
+  python tools/validate_charts.py charts/
+  python tools/validate_charts.py songs/ my_chart.py --verbose --json report.json
+
+Charts are .chart files (src/chart.py) or .py files with a beat_map literal.
+The playability rules come from the game itself: lanes 1-4 as in
+Visuals.spawn_note_in_lane, the note geometry of Visuals, FALL_TIME from
+GameManager and the level split from calculate_level_distribution. Exits
+with status 1 if any chart has errors.
+"""
+import argparse
+import ast
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import sim
+
+sim.install()
+import chart  # noqa: E402
+from GameManager import GameManager, level_distribution  # noqa: E402
+from visual import Visuals  # noqa: E402
+
+FLICK_COOLDOWN = 0.4  # Accelerometer.cooldown
+MAX_LEVEL = 10
+SPEED = Visuals.SPEED * GameManager.FPS  # pixels per second
+FALL_TIME = Visuals.HIT_Y / SPEED
+ON_SCREEN = Visuals.H / SPEED  # how long a note stays on screen
+
+
+def load(path):
+  if path.endswith(".py"):
+    with open(path) as f:
+      tree = ast.parse(f.read())
+    for node in tree.body:
+      if isinstance(node, ast.Assign) and getattr(node.targets[0], "id", None) == "beat_map":
+        return [tuple(note) for note in ast.literal_eval(node.value)]
+    raise ValueError("no beat_map literal")
+  return chart.load_chart(path)
+
+
+def check(notes):
+  """Lists of (index, message) errors and warnings"""
+  errors = []
+  warnings = []
+  last_in_lane = {}
+  holds_in_lane = {}
+  last_flick = None
+
+  for i, note in enumerate(notes):
+    if len(note) == 2:
+      note = (note[0], note[1], "tap")
+    t, lane, note_type = note[:3]
+    duration = note[3] if len(note) > 3 else 0
+    # the times first, a note with a bad field is still out of order
+    if i and t < notes[i - 1][0]:
+      errors.append((i, f"time {t:.3f} before previous note {notes[i - 1][0]:.3f}"))
+    if t < FALL_TIME:
+      errors.append((i, f"time {t:.3f} is earlier than FALL_TIME {FALL_TIME:.3f}, the note lands late"))
+    if not 1 <= lane <= Visuals.LANES:
+      errors.append((i, f"lane {lane} out of range 1-{Visuals.LANES}"))
+      continue
+    if note_type not in chart.NOTE_TYPES:
+      errors.append((i, f"unknown note type {note_type!r}"))
+      continue
+    if (note_type == "hold") != (duration > 0):
+      errors.append((i, "a hold needs a duration, other notes can't have one"))
+      continue
+
+    previous = last_in_lane.get(lane)
+    if previous is not None:
+      # from the end of the previous note, a hold ends with its tail
+      gap = t - previous[0]
+      if gap <= 0 and previous[1] == "hold":
+        errors.append((i, f"starts before the hold in lane {lane} ends"))
+      elif gap <= 0:
+        errors.append((i, f"duplicate note in lane {lane} at {t:.3f}"))
+      elif gap * SPEED < max(Visuals.NOTE_HEIGHTS):
+        # sprites overlap and judge() takes whichever spawned first
+        affected = [Visuals.difficulty_names[d] for d, height in enumerate(Visuals.NOTE_HEIGHTS) if gap * SPEED < height]
+        message = f"overlaps the previous note in lane {lane} ({gap * 1000:.0f} ms apart)"
+        if gap * SPEED < min(Visuals.NOTE_HEIGHTS):
+          errors.append((i, message + " on every difficulty"))
+        else:
+          warnings.append((i, message + " on " + ", ".join(affected)))
+    last_in_lane[lane] = (t + duration, note_type)
+
+    if note_type == "hold":
+      # a hold is on screen from its spawn until its tail is used up
+      shown = [end for end in holds_in_lane.get(lane, []) if end > t - FALL_TIME]
+      shown.append(t + duration)
+      holds_in_lane[lane] = shown
+      if len(shown) > Visuals.HOLD_CAPACITY:
+        errors.append((i, f"more than {Visuals.HOLD_CAPACITY} holds on screen in lane {lane}, dropped as lane full"))
+
+    if note_type == "flick":
+      if last_flick is not None and t - last_flick < FLICK_COOLDOWN:
+        warnings.append((i, f"flick {(t - last_flick) * 1000:.0f} ms after the previous one, inside the {FLICK_COOLDOWN} s cooldown"))
+      last_flick = t
+  return errors, warnings
+
+
+def rate(notes):
+  """Density and difficulty numbers"""
+  # sorted, check() reports charts that aren't
+  ordered = sorted(note[0] for note in notes)
+  if not ordered:
+    return {"notes": 0}
+  duration = max(ordered[-1] - ordered[0], 1e-9)
+
+  # notes in every one-second bucket
+  seconds = max(0, int(ordered[-1])) + 1
+  per_second = [0] * seconds
+  for t in ordered:
+    per_second[max(0, int(t))] += 1
+  busy = sorted(per_second[max(0, int(ordered[0])):])
+
+  # most notes on screen at once (two-pointer sweep over sorted times)
+  peak_on_screen = 0
+  start = 0
+  for end, t in enumerate(ordered):
+    while ordered[start] < t - ON_SCREEN:
+      start += 1
+    peak_on_screen = max(peak_on_screen, end - start + 1)
+
+  flicks = sum(1 for note in notes if len(note) > 2 and note[2] == "flick")
+  holds = sum(1 for note in notes if len(note) > 2 and note[2] == "hold")
+  p90 = busy[int(0.9 * (len(busy) - 1))]
+  counts, starts = level_distribution(len(notes), MAX_LEVEL)
+  return {
+    "notes": len(notes),
+    "flicks": flicks,
+    "holds": holds,
+    "duration": duration,
+    "mean_nps": len(notes) / duration,
+    "peak_nps": busy[-1],
+    "p90_nps": p90,
+    "peak_on_screen": peak_on_screen,
+    # sustained density, flicks count a bit more since they need a full arm move
+    "difficulty": round(p90 * (1 + 0.5 * flicks / len(notes)), 1),
+    "density_per_second": per_second,
+    "level_beat_counts": counts,
+    "level_start_indices": starts,
+  }
+
+
+def analyze(path):
+  try:
+    notes = load(path)
+  except (OSError, ValueError, SyntaxError) as e:
+    return {"path": path, "errors": [(None, f"cannot load: {e}")], "warnings": []}
+  try:
+    errors, warnings = check(notes)
+    report = {"path": path, "errors": errors, "warnings": warnings}
+    report.update(rate(notes))
+  except Exception as e:
+    # a chart too broken to rate is still only one chart of the batch
+    return {"path": path, "errors": [(None, f"cannot check: {type(e).__name__}: {e}")], "warnings": []}
+  return report
+
+
+def find_charts(paths):
+  found = []
+  for path in paths:
+    if os.path.isdir(path):
+      for folder, _, files in os.walk(path):
+        found.extend(os.path.join(folder, name) for name in sorted(files) if name.endswith(".chart"))
+    else:
+      found.append(path)
+  return found
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("paths", nargs="+", help="chart files or directories")
+  parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per CPU)")
+  parser.add_argument("--verbose", action="store_true", help="list every error and warning")
+  parser.add_argument("--json", help="write the full reports to this file")
+  args = parser.parse_args()
+
+  paths = find_charts(args.paths)
+  if not paths:
+    print("no charts found")
+    return 1
+  with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+    reports = list(pool.map(analyze, paths, chunksize=max(1, len(paths) // 64)))
+
+  print(f"{'chart':32} {'notes':>6} {'secs':>6} {'nps':>5} {'peak':>5} {'screen':>6} {'diff':>5} {'err':>4} {'warn':>4}")
+  for r in reports:
+    name = os.path.relpath(r["path"])[-32:]
+    if r.get("notes"):
+      print(f"{name:32} {r['notes']:6d} {r['duration']:6.1f} {r['mean_nps']:5.1f} {r['peak_nps']:5d} {r['peak_on_screen']:6d} {r['difficulty']:5.1f} {len(r['errors']):4d} {len(r['warnings']):4d}")
+    else:
+      print(f"{name:32} {'-':>6} {'':6} {'':5} {'':5} {'':6} {'':5} {len(r['errors']):4d} {len(r['warnings']):4d}")
+    if args.verbose:
+      if r.get("notes"):
+        print("    levels: " + " ".join(str(n) for n in r["level_beat_counts"]))
+      for kind in ("errors", "warnings"):
+        for index, message in r[kind]:
+          where = "" if index is None else f"note {index}: "
+          print(f"    {kind[:-1]}: {where}{message}")
+
+  if args.json:
+    with open(args.json, "w") as f:
+      json.dump(reports, f, indent=1)
+  return 1 if any(r["errors"] for r in reports) else 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())